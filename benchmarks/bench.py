@@ -0,0 +1,429 @@
+import argparse
+import itertools
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "latest.json")
+sys.path.insert(0, ROOT_DIR)
+
+# 픽스처 파일 → 해당 파서 경로를 선택하는 URL
+FIXTURES = {
+    "new_for_2026": "https://gsma.my.site.com/mwcoem/s/New for 2026",
+    "event_rules": "https://gsma.my.site.com/mwcoem/s/Event Rules and Regulations",
+    "stand_build_rules": "https://gsma.my.site.com/mwcoem/s/Stand Build Rules and Regulations",
+}
+# 운영 URL은 %20으로 인코딩되어 있어 parse_generic_rules로 처리되므로 따로 측정합니다.
+GENERIC_FIXTURE = "stand_build_rules"
+PARSER_PATHS = {
+    "lxml-strained": ("lxml", True),
+    "lxml-full": ("lxml", False),
+    "html.parser-strained": ("html.parser", True),
+}
+
+HEADER_RE = re.compile(r"(<h([1-6])\b[^>]*>)(.*?)(</h\2>)", re.S | re.I)
+BODY_RE = re.compile(r"(<body\b[^>]*>)(.*)(</body>)", re.S | re.I)
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, f"{name}.html"), encoding="utf-8") as f:
+        return f.read()
+
+
+def scale_html(html, factor):
+    # 본문을 factor번 반복하고, 카테고리 이름이 겹치지 않도록 헤더에 번호를 붙입니다.
+    if factor == 1:
+        return html
+    match = BODY_RE.search(html)
+    body = match.group(2)
+    copies = [body]
+    for n in range(2, factor + 1):
+        copies.append(
+            HEADER_RE.sub(
+                lambda m: f"{m.group(1)}{m.group(3)} ({n}){m.group(4)}",
+                body,
+            )
+        )
+    return html[: match.end(1)] + "".join(copies) + html[match.start(3) :]
+
+
+def record_fixtures():
+    # 네트워크가 있는 환경에서 운영 페이지를 다시 받아 픽스처를 갱신합니다.
+    from config import CRAWL_URLS
+    from crawler import ExhibitionRuleCrawler
+
+    crawler = ExhibitionRuleCrawler()
+    for name, url in zip(FIXTURES, CRAWL_URLS):
+        html = crawler.fetch_page(url)
+        if html is None:
+            print(f"{url} 페이지를 가져오지 못해 {name} 픽스처를 유지합니다.")
+            continue
+        with open(
+            os.path.join(FIXTURE_DIR, f"{name}.html"), "w", encoding="utf-8"
+        ) as f:
+            f.write(html)
+        print(f"{name} 픽스처 저장 ({len(html)} bytes)")
+
+
+def measure(func, repeat, budget):
+    # 최소 1회, 최대 repeat회 실행하되 누적 시간이 budget을 넘으면 멈추고 중앙값을 씁니다.
+    timings = []
+    while len(timings) < repeat:
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+        if sum(timings) > budget:
+            break
+    return statistics.median(timings)
+
+
+def bench_parse(args, results):
+    from crawler import ExhibitionRuleCrawler
+
+    for name, url in FIXTURES.items():
+        html = load_fixture(name)
+        targets = [(name, url)]
+        if name == GENERIC_FIXTURE:
+            targets.append(("generic", "https://gsma.my.site.com/mwcoem/s/generic"))
+        for scale in args.scales:
+            scaled = scale_html(html, scale)
+            for label, target_url in targets:
+                for path, (backend, strain) in PARSER_PATHS.items():
+                    crawler = ExhibitionRuleCrawler(
+                        parser_backend=backend, parser_strain=strain
+                    )
+                    key = f"parse/{label}/{path}/x{scale}"
+                    results[key] = measure(
+                        lambda: crawler.parse_page(scaled, target_url),
+                        args.repeat,
+                        args.budget,
+                    )
+                    print(f"{key}: {results[key]:.4f}s")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    pages = {}
+
+    def do_GET(self):
+        body = self.pages.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def bench_fetch(args, results):
+    from crawler import ExhibitionRuleCrawler
+
+    scales = [scale for scale in args.scales if scale <= 100]
+    FixtureHandler.pages = {
+        f"/{name}/x{scale}": scale_html(load_fixture(name), scale).encode("utf-8")
+        for name in FIXTURES
+        for scale in scales
+    }
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        crawler = ExhibitionRuleCrawler()
+        for path in FixtureHandler.pages:
+            key = f"fetch{path}"
+            results[key] = measure(
+                lambda: crawler.fetch_page(base + path), args.repeat, args.budget
+            )
+            print(f"{key}: {results[key]:.4f}s")
+    finally:
+        server.shutdown()
+
+
+def bench_save(args, results):
+    # models는 import 시점의 DATABASE_URL을 쓰므로 DB마다 별도 프로세스에서 측정합니다.
+    # sqlite-dedup은 중복 항목 색인(DEDUP_ENABLED)을 켠 저장 비용입니다.
+    databases = {"sqlite": (None, "false"), "sqlite-dedup": (None, "true")}
+    if args.postgres_url:
+        databases["postgres"] = (args.postgres_url, "false")
+
+    for label, (url, dedup) in databases.items():
+        with tempfile.TemporaryDirectory() as workdir:
+            env = dict(
+                os.environ,
+                DATABASE_URL=url or f"sqlite:///{workdir}/bench.db",
+                DEDUP_ENABLED=dedup,
+            )
+            command = [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--stage",
+                "save-worker",
+                "--save-scales",
+                ",".join(map(str, args.save_scales)),
+                "--repeat",
+                str(args.repeat),
+                "--budget",
+                str(args.budget),
+            ]
+            output = subprocess.run(
+                command, env=env, check=True, capture_output=True, text=True
+            ).stdout
+            for key, seconds in json.loads(output.splitlines()[-1]).items():
+                results[f"save/{label}/{key}"] = seconds
+                print(f"save/{label}/{key}: {seconds:.4f}s")
+
+
+def modified_copy(parsed_data, ratio=0.1):
+    # 카테고리마다 약 10%의 항목 본문을 바꿔 부분 갱신을 흉내 냅니다.
+    categories = {}
+    for name, items in parsed_data["categories"].items():
+        step = max(int(1 / ratio), 1)
+        categories[name] = [
+            f"{text} (revised)" if index % step == 0 else text
+            for index, text in enumerate(items)
+        ]
+    return dict(parsed_data, categories=categories)
+
+
+def save_worker(args):
+    from crawler import ExhibitionRuleCrawler
+    from models import init_database
+
+    init_database()
+    crawler = ExhibitionRuleCrawler()
+    html = load_fixture(GENERIC_FIXTURE)
+    results = {}
+    for scale in args.save_scales:
+        parsed = crawler.parse_page(
+            scale_html(html, scale), f"bench://generic/x{scale}"
+        )
+        modified = modified_copy(parsed)
+        first = {"done": False}
+
+        def insert():
+            # 첫 실행만 신규 저장이고, 이후에는 replace 모드로 같은 양을 다시 씁니다.
+            crawler.write_rule(parsed, "reconcile" if not first["done"] else "replace")
+            first["done"] = True
+
+        results[f"x{scale}/insert"] = measure(insert, args.repeat, args.budget)
+        results[f"x{scale}/unchanged"] = measure(
+            lambda: crawler.write_rule(parsed), args.repeat, args.budget
+        )
+
+        def modify():
+            crawler.write_rule(modified)
+            crawler.write_rule(parsed)
+
+        results[f"x{scale}/modified"] = measure(modify, args.repeat, args.budget) / 2
+    # 저장 로그를 건너뛸 수 있도록 결과는 마지막 줄에 JSON으로 출력합니다.
+    print(json.dumps(results))
+
+
+def report_data(scale):
+    from crawler import ExhibitionRuleCrawler
+
+    crawler = ExhibitionRuleCrawler()
+    data = []
+    for name, url in FIXTURES.items():
+        parsed = crawler.parse_page(scale_html(load_fixture(name), scale), url)
+        data.append(
+            {
+                "title": parsed["title"],
+                "url": url,
+                "categories": [
+                    {"name": category, "items": items}
+                    for category, items in parsed["categories"].items()
+                ],
+            }
+        )
+    return data
+
+
+def bench_report(args, results):
+    from report_generator import PDFGenerator, PPTGenerator
+    from report_cache import ReportCache
+    from report_shards import ShardedReportBuilder
+
+    with tempfile.TemporaryDirectory() as workdir:
+        section_dir = os.path.join(workdir, "sections")
+        builder = ShardedReportBuilder(ReportCache(section_dir), args.report_workers)
+        runs = itertools.count()
+
+        def cold(generate):
+            # 섹션 캐시를 비워 모든 섹션을 새로 렌더링합니다.
+            def run(data, path):
+                shutil.rmtree(section_dir)
+                os.makedirs(section_dir)
+                generate(data, path)
+
+            return run
+
+        def one_changed(generate):
+            # 마지막 규칙만 매번 내용이 달라져 그 섹션만 다시 렌더링합니다.
+            # 나머지 섹션은 바로 앞의 cold 측정이 남긴 캐시를 재사용합니다.
+            def run(data, path):
+                changed = dict(data[-1], title=f"{data[-1]['title']} #{next(runs)}")
+                generate([*data[:-1], changed], path)
+
+            return run
+
+        generators = (
+            ("pdf", lambda data, path: PDFGenerator().generate_pdf(data, path)),
+            ("pptx", lambda data, path: PPTGenerator().generate_ppt(data, path)),
+            ("pdf-sharded", cold(builder.generate_pdf)),
+            ("pdf-sharded-one-changed", one_changed(builder.generate_pdf)),
+            ("pptx-sharded", cold(builder.generate_ppt)),
+            ("pptx-sharded-one-changed", one_changed(builder.generate_ppt)),
+        )
+        try:
+            for scale in args.report_scales:
+                data = report_data(scale)
+                for extension, generate in generators:
+                    path = os.path.join(workdir, f"report.{extension}")
+                    key = f"report/{extension}/x{scale}"
+                    results[key] = measure(
+                        lambda: generate(data, path), args.repeat, args.budget
+                    )
+                    print(f"{key}: {results[key]:.4f}s")
+        finally:
+            builder.shutdown()
+
+
+def compare(results, baseline, threshold, min_delta):
+    regressions = []
+    for key, seconds in sorted(results.items()):
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        # 아주 짧은 측정값은 잡음이 크므로 절대 차이가 min_delta 이하이면 무시합니다.
+        if seconds > reference * (1 + threshold) and seconds - reference > min_delta:
+            regressions.append((key, reference, seconds))
+    return regressions
+
+
+def parse_scales(value):
+    return [int(scale) for scale in value.split(",") if scale.strip()]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="크롤러/리포트 오프라인 벤치마크")
+    parser.add_argument(
+        "--stage",
+        action="append",
+        choices=["parse", "fetch", "save", "report", "save-worker"],
+        help="실행할 단계 (여러 번 지정 가능, 기본: 전체)",
+    )
+    parser.add_argument("--scales", type=parse_scales, default=[1, 10, 100, 1000])
+    parser.add_argument("--save-scales", type=parse_scales, default=[1, 10, 100, 1000])
+    parser.add_argument("--report-scales", type=parse_scales, default=[1, 10, 100])
+    parser.add_argument(
+        "--report-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="분할 리포트 생성에 쓸 프로세스 수",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--budget", type=float, default=2.0, help="측정 항목당 최대 누적 실행 시간(초)"
+    )
+    parser.add_argument(
+        "--postgres-url",
+        default=os.getenv("BENCH_POSTGRES_URL"),
+        help="지정하면 저장 단계를 PostgreSQL에서도 측정합니다",
+    )
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=float(os.getenv("BENCH_THRESHOLD", "0.25")),
+        help="기준선 대비 허용 증가율 (0.25 = 25%%)",
+    )
+    parser.add_argument("--min-delta", type=float, default=0.005)
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="CRAWL_URLS에서 픽스처를 다시 받아 저장하고 종료합니다",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="이번 결과로 기준선을 갱신합니다",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.record:
+        record_fixtures()
+        return 0
+    stages = args.stage or ["parse", "fetch", "save", "report"]
+    if stages == ["save-worker"]:
+        save_worker(args)
+        return 0
+
+    results = {}
+    runners = {
+        "parse": bench_parse,
+        "fetch": bench_fetch,
+        "save": bench_save,
+        "report": bench_report,
+    }
+    for stage in stages:
+        runners[stage](args, results)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"결과 저장: {args.output}")
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"기준선 갱신: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("기준선이 없어 비교를 건너뜁니다. --update-baseline으로 생성하세요.")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold, args.min_delta)
+    for key, reference, seconds in regressions:
+        print(
+            f"성능 저하: {key} {reference:.4f}s → {seconds:.4f}s "
+            f"(+{(seconds / reference - 1) * 100:.0f}%)"
+        )
+    if regressions:
+        return 1
+    print(f"기준선 대비 {args.threshold * 100:.0f}% 이상 느려진 항목이 없습니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -9,10 +10,130 @@ DB_USER = os.getenv("DB_USER", "username")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "password")
 DB_NAME = os.getenv("DB_NAME", "exhibition_rules")
 
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+DATABASE_URL = os.getenv(
+    "DATABASE_URL",
+    f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}",
+)
 
 POSTGRES_HOST = DB_HOST
 POSTGRES_PORT = DB_PORT
 POSTGRES_DB = DB_NAME
 POSTGRES_USER = DB_USER
 POSTGRES_PASSWORD = DB_PASSWORD
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+CRAWL_URLS = [
+    url.strip()
+    for url in os.getenv(
+        "CRAWL_URLS",
+        ",".join(
+            [
+                "https://gsma.my.site.com/mwcoem/s/New%20for%202026",
+                "https://gsma.my.site.com/mwcoem/s/Event%20Rules%20and%20Regulations",
+                "https://gsma.my.site.com/mwcoem/s/Stand%20Build%20Rules%20and%20Regulations",
+            ]
+        ),
+    ).split(",")
+    if url.strip()
+]
+
+CRAWL_TIMEOUT = float(os.getenv("CRAWL_TIMEOUT", "30"))
+CRAWL_MAX_WORKERS = int(os.getenv("CRAWL_MAX_WORKERS", "8"))
+CRAWL_PER_HOST_LIMIT = int(os.getenv("CRAWL_PER_HOST_LIMIT", "4"))
+CRAWL_MAX_RETRIES = int(os.getenv("CRAWL_MAX_RETRIES", "3"))
+CRAWL_BACKOFF_BASE = float(os.getenv("CRAWL_BACKOFF_BASE", "0.5"))
+CRAWL_BACKOFF_MAX = float(os.getenv("CRAWL_BACKOFF_MAX", "10"))
+CRAWL_DEADLINE = float(os.getenv("CRAWL_DEADLINE", "300"))
+
+# "reconcile": 변경된 행만 반영, "replace": 기존 규칙을 지우고 다시 저장
+SAVE_MODE = os.getenv("SAVE_MODE", "reconcile")
+SAVE_BATCH_SIZE = int(os.getenv("SAVE_BATCH_SIZE", "500"))
+
+# "lxml"(기본) 또는 "html.parser"; PARSER_STRAIN은 본문 블록만 트리로 만듭니다.
+PARSER_BACKEND = os.getenv("PARSER_BACKEND", "lxml")
+PARSER_STRAIN = os.getenv("PARSER_STRAIN", "true").lower() in ("1", "true", "yes")
+
+# 페이지 수집 방식: "html"(기본, HTML 셸 파싱), "salesforce"(CMS JSON 직접 요청),
+# "replay"(FETCHER_CASSETTE_DIR에 기록된 응답 사용). FETCHER_RECORD=true면 응답을 기록합니다.
+FETCHER_BACKEND = os.getenv("FETCHER_BACKEND", "html")
+FETCHER_RECORD = os.getenv("FETCHER_RECORD", "false").lower() in ("1", "true", "yes")
+FETCHER_CASSETTE_DIR = os.getenv("FETCHER_CASSETTE_DIR", "cassettes")
+# {origin}, {site}, {channel}, {page}, {slug} 자리표시자를 사용합니다.
+SALESFORCE_CONTENT_URL = os.getenv(
+    "SALESFORCE_CONTENT_URL",
+    "{origin}/{site}/services/data/v59.0/connect/cms/delivery/channels/{channel}"
+    "/contents/query?urlName={slug}&includeContentBody=true",
+)
+SALESFORCE_CMS_CHANNEL = os.getenv("SALESFORCE_CMS_CHANNEL", "")
+
+# 번역 단계: "none"(기본, 원문 그대로), "standin"(로컬 테스트용), "deepl"
+TRANSLATOR_BACKEND = os.getenv("TRANSLATOR_BACKEND", "none")
+TRANSLATION_SOURCE_LANG = os.getenv("TRANSLATION_SOURCE_LANG", "en")
+TRANSLATION_TARGET_LANG = os.getenv("TRANSLATION_TARGET_LANG", "ko")
+TRANSLATION_BATCH_SIZE = int(os.getenv("TRANSLATION_BATCH_SIZE", "50"))
+TRANSLATION_BATCH_CHARS = int(os.getenv("TRANSLATION_BATCH_CHARS", "20000"))
+TRANSLATION_CONCURRENCY = int(os.getenv("TRANSLATION_CONCURRENCY", "2"))
+DEEPL_API_KEY = os.getenv("DEEPL_API_KEY", "")
+DEEPL_API_URL = os.getenv("DEEPL_API_URL", "https://api-free.deepl.com/v2/translate")
+
+# 거의 같은 항목 묶기: 저장할 때 MinHash LSH로 후보를 찾고 단어 2-gram 자카드 유사도가
+# DEDUP_THRESHOLD 이상이면 먼저 저장된 항목에 묶습니다. 0.5 미만으로 낮추면 후보를 놓치기 쉽습니다.
+# 저장마다 색인 작업이 더해지므로 기본은 꺼져 있습니다(켜기 전에 python dedup.py rebuild).
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "false").lower() in ("1", "true", "yes")
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.7"))
+
+REPORT_CACHE_DIR = os.getenv(
+    "REPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "exhibition_reports")
+)
+REPORT_CACHE_MAX_BYTES = int(
+    os.getenv("REPORT_CACHE_MAX_BYTES", str(200 * 1024 * 1024))
+)
+REPORT_CACHE_MAX_AGE = int(os.getenv("REPORT_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+REPORT_MAX_CONCURRENCY = int(os.getenv("REPORT_MAX_CONCURRENCY", "2"))
+REPORT_STREAM_CHUNK_SIZE = int(os.getenv("REPORT_STREAM_CHUNK_SIZE", str(64 * 1024)))
+# 0이면 기존처럼 한 스레드에서 생성하고, 1 이상이면 규칙 문서별 섹션을 프로세스 풀에서 생성합니다.
+REPORT_SHARD_WORKERS = int(os.getenv("REPORT_SHARD_WORKERS", "0"))
+# 대량 내보내기에서 서버 측 커서로 한 번에 가져오는 행 수
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# 모듈별 import 시간을 기록해 /startup/profile로 보여줍니다. 모든 import에
+# sys.meta_path 훅이 끼므로 측정할 때만 켭니다.
+STARTUP_PROFILE = os.getenv("STARTUP_PROFILE", "false").lower() in ("1", "true", "yes")
+# 시작 직후 백그라운드에서 미리 불러올 무거운 기능 (reports, crawler 중 쉼표로 구분, 비우면 첫 사용 시 로딩)
+STARTUP_WARMUP = [
+    name.strip() for name in os.getenv("STARTUP_WARMUP", "").split(",") if name.strip()
+]
+
+# 단계별 소요 시간을 stdout에 남깁니다(/metrics는 항상 제공).
+METRICS_TRACE_LOG = os.getenv("METRICS_TRACE_LOG", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+# 렌더링된 HTML 페이지 캐시 (TTL 단위: 초)
+PAGE_CACHE_MAX_ENTRIES = int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "512"))
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+PAGE_CACHE_TTL = float(os.getenv("PAGE_CACHE_TTL", "5"))
+
+CRAWL_JOB_HISTORY = int(os.getenv("CRAWL_JOB_HISTORY", "20"))
+
+# 적응형 재크롤링 스케줄러 (간격 단위: 초)
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+SCHEDULER_TICK = float(os.getenv("SCHEDULER_TICK", "60"))
+SCHEDULER_MIN_INTERVAL = int(os.getenv("SCHEDULER_MIN_INTERVAL", str(15 * 60)))
+SCHEDULER_MAX_INTERVAL = int(os.getenv("SCHEDULER_MAX_INTERVAL", str(24 * 3600)))
+SCHEDULER_INITIAL_INTERVAL = int(os.getenv("SCHEDULER_INITIAL_INTERVAL", str(3600)))
+SCHEDULER_SPEEDUP = float(os.getenv("SCHEDULER_SPEEDUP", "0.5"))
+SCHEDULER_BACKOFF = float(os.getenv("SCHEDULER_BACKOFF", "1.5"))
+SCHEDULER_JITTER = float(os.getenv("SCHEDULER_JITTER", "0.1"))
+SCHEDULER_MAX_CRAWLS_PER_HOUR = int(os.getenv("SCHEDULER_MAX_CRAWLS_PER_HOUR", "30"))
@@ -0,0 +1,165 @@
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from crawler import ExhibitionRuleCrawler, CrawlProgress
+from config import CRAWL_JOB_HISTORY
+
+FINISHED_STATES = {"succeeded", "failed", "cancelled"}
+
+
+class CrawlJob(CrawlProgress):
+    def __init__(self, urls, force=False):
+        self.id = uuid.uuid4().hex[:12]
+        self.urls = list(urls)
+        self.key = frozenset(self.urls)
+        self.force = force
+        self.status = "queued"
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+        self.failure = None
+        self.peak_memory_mb = None
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self.progress = {
+            url: {"status": "pending", "stage": None, "timings": {}, "errors": []}
+            for url in self.urls
+        }
+
+    def stage(self, url, stage):
+        with self._lock:
+            self.progress[url]["status"] = "running"
+            self.progress[url]["stage"] = stage
+
+    def timing(self, url, stage, seconds):
+        with self._lock:
+            self.progress[url]["timings"][stage] = round(seconds, 3)
+
+    def error(self, url, message):
+        with self._lock:
+            self.progress[url]["errors"].append(message)
+
+    def done(self, url, status):
+        with self._lock:
+            self.progress[url]["status"] = status
+            self.progress[url]["stage"] = None
+
+    def memory(self, peak_mb):
+        self.peak_memory_mb = peak_mb
+
+    def is_cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATES
+
+    def to_dict(self):
+        with self._lock:
+            progress = {
+                url: {
+                    "status": entry["status"],
+                    "stage": entry["stage"],
+                    "timings": dict(entry["timings"]),
+                    "errors": list(entry["errors"]),
+                }
+                for url, entry in self.progress.items()
+            }
+        completed = sum(
+            1
+            for entry in progress.values()
+            if entry["status"] not in ("pending", "running")
+        )
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "cancel_requested": self.is_cancelled(),
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.failure,
+            "peak_memory_mb": self.peak_memory_mb,
+            "completed": completed,
+            "total": len(progress),
+            "urls": progress,
+        }
+
+
+class CrawlJobManager:
+    def __init__(self, history_size=CRAWL_JOB_HISTORY, crawler_factory=None):
+        self.history_size = history_size
+        self.crawler_factory = crawler_factory or ExhibitionRuleCrawler
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._active = {}
+        # 서로 다른 URL 묶음이라도 저장 경합을 막기 위해 작업은 한 번에 하나씩 실행합니다.
+        self._run_lock = threading.Lock()
+
+    def submit(self, urls, force=False):
+        key = frozenset(urls)
+        with self._lock:
+            job_id = self._active.get(key)
+            if job_id is not None:
+                job = self._jobs[job_id]
+                if not job.finished and not job.is_cancelled():
+                    return job, False
+
+            job = CrawlJob(urls, force)
+            self._jobs[job.id] = job
+            self._active[key] = job.id
+
+        thread = threading.Thread(
+            target=self._run, args=(job,), name=f"crawl-job-{job.id}", daemon=True
+        )
+        thread.start()
+        return job, True
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if not job.finished:
+            job.cancel()
+        return job
+
+    def list(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _run(self, job):
+        with self._run_lock:
+            if job.is_cancelled():
+                job.status = "cancelled"
+                for url in job.urls:
+                    job.done(url, "cancelled")
+            else:
+                job.status = "running"
+                job.started_at = datetime.utcnow()
+                try:
+                    self.crawler_factory().crawl_and_save(
+                        job.urls, force=job.force, progress=job
+                    )
+                    job.status = "cancelled" if job.is_cancelled() else "succeeded"
+                except Exception as e:
+                    job.status = "failed"
+                    job.failure = str(e)
+                    print(f"Crawl job {job.id} failed: {str(e)}")
+            job.finished_at = datetime.utcnow()
+
+        with self._lock:
+            if self._active.get(job.key) == job.id:
+                del self._active[job.key]
+            self._trim()
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(len(finished) - self.history_size, 0)]:
+            del self._jobs[job_id]
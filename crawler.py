@@ -1,76 +1,396 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer, FeatureNotFound
 import re
-from models import ExhibitionRule, RuleCategory, RuleItem, get_session
-from sqlalchemy.orm import Session
+import sys
+import random
+import hashlib
+
+try:
+    import resource
+except ImportError:
+    resource = None
+import threading
+import time
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+    FIRST_COMPLETED,
+)
+from urllib.parse import urlparse
+from datetime import datetime
+from models import (
+    ExhibitionRule,
+    RuleCategory,
+    RuleItem,
+    PageFetchState,
+    get_session,
+    init_database,
+)
+from page_cache import page_cache
+import metrics
+from snapshots import record_snapshot
+from dedup import relink_page
+from translation import TranslationPipeline
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.orm import Session, selectinload
+from config import (
+    CRAWL_URLS,
+    CRAWL_TIMEOUT,
+    CRAWL_MAX_WORKERS,
+    CRAWL_PER_HOST_LIMIT,
+    CRAWL_MAX_RETRIES,
+    CRAWL_BACKOFF_BASE,
+    CRAWL_BACKOFF_MAX,
+    CRAWL_DEADLINE,
+    SAVE_MODE,
+    SAVE_BATCH_SIZE,
+    PARSER_BACKEND,
+    PARSER_STRAIN,
+    DEDUP_ENABLED,
+)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+_VOLATILE_MARKUP = re.compile(
+    r"<script\b.*?</script>|<style\b.*?</style>|<!--.*?-->",
+    re.IGNORECASE | re.DOTALL,
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def item_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def content_hash(html):
+    normalized = _WHITESPACE.sub(" ", _VOLATILE_MARKUP.sub("", html)).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+HEADER_LEVELS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+# 사이트 공통 영역(내비게이션, 푸터 등)은 본문이 아니므로 하위 트리 전체를 건너뜁니다.
+CHROME_TAGS = {"header", "footer", "nav", "aside"}
+SKIPPED_TAGS = {"script", "style", "noscript", "template", "head", *CHROME_TAGS}
+# 헤더와 본문 블록만 트리로 만들고 나머지 마크업(스크립트 등)은 버립니다.
+# 공통 영역 태그도 남겨야 그 안의 <p>가 본문 블록으로 풀려나오지 않고 함께 건너뛰어집니다.
+CONTENT_STRAINER = SoupStrainer(
+    ["title", "p", "ul", "ol", *HEADER_LEVELS, *CHROME_TAGS]
+)
+
+
+def peak_memory_mb():
+    if resource is None:
+        return None
+    # 리눅스의 ru_maxrss 단위는 KB, macOS는 바이트입니다.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak /= 1024
+    return round(peak / 1024, 1)
+
+
+def make_soup(html, backend=PARSER_BACKEND, strain=PARSER_STRAIN):
+    parse_only = CONTENT_STRAINER if strain else None
+    try:
+        return BeautifulSoup(html, backend, parse_only=parse_only)
+    except FeatureNotFound:
+        return BeautifulSoup(html, "html.parser", parse_only=parse_only)
+
+
+class Section:
+    __slots__ = ("level", "title", "blocks", "children")
+
+    def __init__(self, level, title):
+        self.level = level
+        self.title = title
+        self.blocks = []
+        self.children = []
+
+    def iter_sections(self, levels=None):
+        stack = list(reversed(self.children))
+        while stack:
+            section = stack.pop()
+            if levels is None or section.level in levels:
+                yield section
+            stack.extend(reversed(section.children))
+
+    def iter_blocks(self, stop_level):
+        # stop_level 이하의 하위 헤더가 나오면 그 섹션의 내용은 포함하지 않습니다.
+        yield from self.blocks
+        for child in self.children:
+            if child.level > stop_level:
+                yield from child.iter_blocks(stop_level)
+
+
+def segment_sections(soup):
+    root = Section(0, None)
+    open_sections = [root]
+    stack = list(reversed(soup.contents))
+    while stack:
+        node = stack.pop()
+        name = getattr(node, "name", None)
+        if name is None or name in SKIPPED_TAGS:
+            continue
+
+        if name in HEADER_LEVELS:
+            level = HEADER_LEVELS[name]
+            while open_sections[-1].level >= level:
+                open_sections.pop()
+            section = Section(level, node.get_text(strip=True))
+            open_sections[-1].children.append(section)
+            open_sections.append(section)
+        elif name == "p":
+            open_sections[-1].blocks.append(("p", node.get_text(strip=True)))
+        elif name in ("ul", "ol"):
+            texts = [li.get_text(strip=True) for li in node.find_all("li")]
+            open_sections[-1].blocks.append((name, texts))
+        else:
+            stack.extend(reversed(node.contents))
+    return root
+
+
+class CrawlDeadlineExceeded(Exception):
+    pass
+
+
+class CrawlProgress:
+    # 진행 상황을 받지 않는 호출(스크립트, 데모)을 위한 기본 구현입니다.
+    def stage(self, url, stage):
+        pass
+
+    def timing(self, url, stage, seconds):
+        pass
+
+    def error(self, url, message):
+        pass
+
+    def done(self, url, status):
+        pass
+
+    def memory(self, peak_mb):
+        pass
+
+    def is_cancelled(self):
+        return False
 
 
 class ExhibitionRuleCrawler:
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers=CRAWL_MAX_WORKERS,
+        per_host_limit=CRAWL_PER_HOST_LIMIT,
+        max_retries=CRAWL_MAX_RETRIES,
+        timeout=CRAWL_TIMEOUT,
+        deadline=CRAWL_DEADLINE,
+        batch_size=SAVE_BATCH_SIZE,
+        parser_backend=PARSER_BACKEND,
+        parser_strain=PARSER_STRAIN,
+        fetcher=None,
+        translation=None,
+    ):
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.deadline = deadline
+        self.batch_size = batch_size
+        self.parser_backend = parser_backend
+        self.parser_strain = parser_strain
+        self._host_slots = {}
+        self._host_lock = threading.Lock()
+
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=max(max_workers, 10))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         self.session.headers.update(
             {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
             }
         )
-
-    def fetch_page(self, url):
+        if fetcher is None:
+            # fetchers가 이 모듈을 import하므로 순환 import를 피해 여기서 불러옵니다.
+            from fetchers import make_fetcher
+
+            fetcher = make_fetcher(self)
+        self.fetcher = fetcher
+        self.translation = translation or TranslationPipeline()
+
+    def _host_slot(self, url):
+        host = urlparse(url).netloc
+        with self._host_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_slots[host]
+
+    def _backoff(self, attempt):
+        delay = min(CRAWL_BACKOFF_MAX, CRAWL_BACKOFF_BASE * (2**attempt))
+        return random.uniform(0, delay)
+
+    def _remaining(self, deadline_at):
+        if deadline_at is None:
+            return None
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise CrawlDeadlineExceeded("crawl deadline exceeded")
+        return remaining
+
+    def _get(self, url, deadline_at=None, headers=None):
+        with metrics.traced(metrics.FETCH_SECONDS, "fetch", status="error") as labels:
+            response = self._request(url, deadline_at, headers)
+            labels["status"] = response.status_code
+            metrics.FETCH_BYTES.inc(len(response.content))
+            return response
+
+    def _request(self, url, deadline_at=None, headers=None):
+        attempt = 0
+        while True:
+            remaining = self._remaining(deadline_at)
+            timeout = (
+                self.timeout if remaining is None else min(self.timeout, remaining)
+            )
+            try:
+                with self._host_slot(url):
+                    response = self.session.get(url, timeout=timeout, headers=headers)
+                metrics.FETCH_REQUESTS.inc(status=response.status_code)
+                if response.status_code not in RETRYABLE_STATUS:
+                    response.raise_for_status()
+                    return response
+                error = requests.HTTPError(
+                    f"{response.status_code} for url: {url}", response=response
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                metrics.FETCH_REQUESTS.inc(status=type(e).__name__)
+                error = e
+
+            if attempt >= self.max_retries:
+                raise error
+            delay = self._backoff(attempt)
+            remaining = self._remaining(deadline_at)
+            if remaining is not None and delay >= remaining:
+                raise error
+            time.sleep(delay)
+            metrics.FETCH_RETRIES.inc()
+            attempt += 1
+
+    def fetch_page(self, url, deadline_at=None):
         try:
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
+            response = self._get(url, deadline_at)
             response.encoding = "utf-8"
             return response.text
         except Exception as e:
             print(f"Error fetching {url}: {str(e)}")
             return None
 
-    def parse_page(self, html, url):
-        soup = BeautifulSoup(html, "html.parser")
+    def fetch_if_changed(self, url, state=None, deadline_at=None):
+        return self.fetcher.fetch(url, state, deadline_at)
 
-        title_element = soup.find("h1") or soup.find("h2") or soup.find("title")
-        title = title_element.get_text(strip=True) if title_element else "Unknown Title"
+    def load_fetch_states(self, urls):
+        db = get_session()
+        try:
+            rows = db.query(PageFetchState).filter(PageFetchState.url.in_(urls)).all()
+            return {
+                row.url: {
+                    "etag": row.etag,
+                    "last_modified": row.last_modified,
+                    "content_hash": row.content_hash,
+                }
+                for row in rows
+            }
+        finally:
+            db.close()
 
-        categories = {}
+    def record_fetch_state(self, fetched, validators=True):
+        db = get_session()
+        try:
+            now = datetime.utcnow()
+            state = db.query(PageFetchState).filter_by(url=fetched["url"]).first()
+            if state is None:
+                state = PageFetchState(url=fetched["url"])
+                db.add(state)
+            state.checked_at = now
+            if validators and fetched["status"] in ("modified", "unchanged"):
+                state.etag = fetched["etag"]
+                state.last_modified = fetched["last_modified"]
+                if state.content_hash != fetched["content_hash"]:
+                    state.content_hash = fetched["content_hash"]
+                    state.changed_at = now
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Database error: {str(e)}")
+        finally:
+            db.close()
 
+    def parse_page(self, html, url):
         if "New for 2026" in url:
-            categories = self.parse_new_for_2026(soup)
+            parser = "new_for_2026"
         elif "Event Rules" in url:
-            categories = self.parse_event_rules(soup)
+            parser = "event_rules"
         elif "Stand Build Rules" in url:
-            categories = self.parse_stand_build_rules(soup)
+            parser = "stand_build_rules"
         else:
-            categories = self.parse_generic_rules(soup)
+            parser = "generic"
+
+        with metrics.traced(metrics.PARSE_SECONDS, "parse", parser=parser):
+            parsed_data = self._parse_page(html, url, parser)
+        metrics.PARSED_CATEGORIES.inc(len(parsed_data["categories"]), parser=parser)
+        metrics.PARSED_ITEMS.inc(
+            sum(len(items) for items in parsed_data["categories"].values()),
+            parser=parser,
+        )
+        return parsed_data
 
-        return {"title": title, "url": url, "categories": categories}
+    def _parse_page(self, html, url, parser):
+        soup = make_soup(html, self.parser_backend, self.parser_strain)
 
-    def parse_new_for_2026(self, soup):
+        title_element = soup.find("h1") or soup.find("h2") or soup.find("title")
+        title = title_element.get_text(strip=True) if title_element else "Unknown Title"
+
+        sections = segment_sections(soup)
+        # 추출이 끝난 트리는 바로 해제하여 병렬 크롤링 시 메모리를 제한합니다.
+        soup.decompose()
         categories = {}
 
-        h3_elements = soup.find_all("h3")
-        for h3 in h3_elements:
-            if h3.get_text(strip=True) and not h3.get_text(strip=True).startswith("<>"):
-                category_name = h3.get_text(strip=True)
+        if parser == "new_for_2026":
+            categories = self.parse_new_for_2026(sections)
+        elif parser == "event_rules":
+            categories = self.parse_event_rules(sections)
+        elif parser == "stand_build_rules":
+            categories = self.parse_stand_build_rules(sections)
+        else:
+            categories = self.parse_generic_rules(sections)
 
-                items = []
-                next_element = h3.find_next_sibling()
-                while next_element and next_element.name != "h3":
-                    if next_element.name == "p" and next_element.get_text(strip=True):
-                        text = next_element.get_text(strip=True)
-                        if len(text) > 20:
-                            items.append(text)
-                    next_element = next_element.find_next_sibling()
+        return {"title": title, "url": url, "categories": categories}
+
+    def _section_items(self, section, stop_level, min_p, min_li, list_tags):
+        items = []
+        for kind, value in section.iter_blocks(stop_level):
+            if kind == "p":
+                if len(value) > min_p:
+                    items.append(value)
+            elif kind in list_tags:
+                items.extend(text for text in value if text and len(text) > min_li)
+        return items
+
+    def parse_new_for_2026(self, sections):
+        categories = {}
 
+        for section in sections.iter_sections(levels=(3,)):
+            category_name = section.title
+            if category_name and not category_name.startswith("<>"):
+                items = self._section_items(section, 3, 20, 0, ())
                 if items:
                     categories[category_name] = items
 
         return categories
 
-    def parse_event_rules(self, soup):
+    def parse_event_rules(self, sections):
         categories = {}
 
-        h3_elements = soup.find_all("h3")
-        for h3 in h3_elements:
-            category_name = h3.get_text(strip=True)
+        for section in sections.iter_sections(levels=(3,)):
+            category_name = section.title
             if (
                 not category_name
                 or category_name.startswith("###")
@@ -78,159 +398,619 @@ class ExhibitionRuleCrawler:
             ):
                 continue
 
-            items = []
-            next_element = h3.find_next_sibling()
-            while next_element and next_element.name not in ["h1", "h2", "h3"]:
-                if next_element.name == "p":
-                    text = next_element.get_text(strip=True)
-                    if len(text) > 20:
-                        items.append(text)
-                elif next_element.name == "ul":
-                    for li in next_element.find_all("li"):
-                        text = li.get_text(strip=True)
-                        if text:
-                            items.append(text)
-                next_element = next_element.find_next_sibling()
-
+            items = self._section_items(section, 3, 20, 0, ("ul",))
             if items:
                 categories[category_name] = items
 
         return categories
 
-    def parse_stand_build_rules(self, soup):
+    def parse_stand_build_rules(self, sections):
         categories = {}
 
-        section_headers = soup.find_all(["h2", "h3", "h4"])
-        for header in section_headers:
-            category_name = header.get_text(strip=True)
+        for section in sections.iter_sections(levels=(2, 3, 4)):
+            category_name = section.title
             if not category_name or len(category_name) < 5:
                 continue
 
-            items = []
-            next_element = header.find_next_sibling()
-            while next_element and next_element.name not in ["h1", "h2", "h3", "h4"]:
-                if next_element.name == "p":
-                    text = next_element.get_text(strip=True)
-                    if len(text) > 30:
-                        items.append(text)
-                elif next_element.name == "ul":
-                    for li in next_element.find_all("li"):
-                        text = li.get_text(strip=True)
-                        if text and len(text) > 10:
-                            items.append(text)
-                next_element = next_element.find_next_sibling()
-
+            items = self._section_items(section, 4, 30, 10, ("ul",))
             if items:
                 categories[category_name] = items[:5]
 
         return categories
 
-    def parse_generic_rules(self, soup):
+    def parse_generic_rules(self, sections):
         categories = {}
 
-        all_headers = soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6"])
-        for header in all_headers:
-            category_name = header.get_text(strip=True)
+        for section in sections.iter_sections(levels=(1, 2, 3, 4, 5, 6)):
+            category_name = section.title
             if len(category_name) < 5:
                 continue
 
-            items = []
-            next_element = header.find_next_sibling()
-            count = 0
-            while next_element and count < 10:
-                if next_element.name in ["h1", "h2", "h3", "h4", "h5", "h6"]:
-                    break
-
-                if next_element.name == "p":
-                    text = next_element.get_text(strip=True)
-                    if len(text) > 20:
-                        items.append(text)
-                        count += 1
-                elif next_element.name in ["ul", "ol"]:
-                    for li in next_element.find_all("li"):
-                        text = li.get_text(strip=True)
-                        if text and len(text) > 10:
-                            items.append(text)
-                            count += 1
-                            if count >= 10:
-                                break
-
-                next_element = next_element.find_next_sibling()
-
+            items = self._section_items(section, 6, 20, 10, ("ul", "ol"))
             if items:
-                categories[category_name] = items
+                categories[category_name] = items[:10]
 
         return categories
 
-    def save_to_database(self, parsed_data):
+    def save_to_database(self, parsed_data, mode=SAVE_MODE):
+        try:
+            self.write_rule(parsed_data, mode)
+            return True
+        except Exception as e:
+            metrics.SAVE_FAILURES.inc()
+            print(f"Database error: {str(e)}")
+            return False
+
+    def write_rule(self, parsed_data, mode=SAVE_MODE):
+        with metrics.traced(metrics.SAVE_SECONDS, "save", mode=mode):
+            stats = self._write_rule(parsed_data, mode)
+        for operation in ("inserted", "updated", "reordered", "deleted", "unchanged"):
+            metrics.SAVED_ROWS.inc(stats[operation], operation=operation)
+        return stats
+
+    def _write_rule(self, parsed_data, mode):
         db = get_session()
         try:
-            existing_rule = (
-                db.query(ExhibitionRule).filter_by(url=parsed_data["url"]).first()
+            # 페이지 하나를 하나의 트랜잭션으로 저장합니다.
+            state = self._dedup_state(db, parsed_data["url"]) if DEDUP_ENABLED else None
+            if mode == "replace":
+                stats = self._replace_rule(db, parsed_data)
+            else:
+                stats = self._reconcile_rule(db, parsed_data)
+            self._record_snapshot(db, stats["rule_ids"][-1], parsed_data)
+            changed = any(
+                stats[key] for key in ("inserted", "updated", "reordered", "deleted")
             )
-            if existing_rule:
-                db.delete(existing_rule)
-                db.commit()
+            linked_rule_ids = []
+            if changed and DEDUP_ENABLED:
+                linked_rule_ids = self._link_duplicates(
+                    db, stats["rule_ids"][-1], state
+                )
+            db.commit()
+            if changed:
+                page_cache.invalidate_rules(stats["rule_ids"] + linked_rule_ids)
+            print(
+                f"Successfully saved rules from {parsed_data['url']} "
+                f"(inserted={stats['inserted']}, updated={stats['updated']}, "
+                f"reordered={stats['reordered']}, deleted={stats['deleted']}, "
+                f"unchanged={stats['unchanged']})"
+            )
+            return stats
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
 
-            exhibition_rule = ExhibitionRule(
-                url=parsed_data["url"], title=parsed_data["title"]
+    def _page_items(self, url=None, rule_id=None):
+        statement = select(
+            RuleItem.id, RuleItem.content_hash, RuleItem.canonical_item_id
+        ).join(RuleCategory, RuleItem.category_id == RuleCategory.id)
+        if url is not None:
+            statement = statement.join(
+                ExhibitionRule, RuleCategory.exhibition_rule_id == ExhibitionRule.id
+            ).where(ExhibitionRule.url == url)
+        else:
+            statement = statement.where(RuleCategory.exhibition_rule_id == rule_id)
+        return statement
+
+    def _dedup_state(self, db, url):
+        # 저장 전 페이지 항목과, 그 항목을 대표로 삼는 항목을 읽어 둡니다.
+        page_ids = self._page_items(url=url).with_only_columns(RuleItem.id)
+        previous = db.execute(self._page_items(url=url)).all()
+        dependents = db.execute(
+            select(RuleItem.id, RuleItem.canonical_item_id).where(
+                RuleItem.canonical_item_id.in_(page_ids)
             )
-            db.add(exhibition_rule)
-            db.commit()
-            db.refresh(exhibition_rule)
+        ).all()
+        return previous, dependents
 
-            for category_name, items in parsed_data["categories"].items():
-                category = RuleCategory(
-                    exhibition_rule_id=exhibition_rule.id,
-                    name=category_name,
-                    name_en=category_name,
-                )
-                db.add(category)
-                db.commit()
-                db.refresh(category)
-
-                for idx, item in enumerate(items):
-                    rule_item = RuleItem(
-                        category_id=category.id,
-                        content_ko=item,
-                        content_en=item,
-                        order_index=idx,
+    def _link_duplicates(self, db, rule_id, state):
+        # 본문 해시가 새로 생기거나 바뀐 항목만 중복 색인에 반영합니다. 실패해도 저장은 계속되도록
+        # 세이브포인트 안에서 실행하고, 놓친 링크는 python dedup.py rebuild로 다시 만듭니다.
+        try:
+            with db.begin_nested():
+                current = db.execute(self._page_items(rule_id=rule_id)).all()
+                linked_rule_ids = relink_page(db, *state, current)
+                others = [id_ for id_ in linked_rule_ids if id_ != rule_id]
+                if others:
+                    # 다른 문서의 항목 링크가 바뀌었으면 그 문서의 캐시된 페이지와 보고서도 다시 만들어지도록 합니다.
+                    db.execute(
+                        update(ExhibitionRule)
+                        .where(ExhibitionRule.id.in_(others))
+                        .values(updated_at=datetime.utcnow())
                     )
-                    db.add(rule_item)
+                return others
+        except Exception as e:
+            print(f"Duplicate index error: {str(e)}")
+            return []
+
+    def _record_snapshot(self, db, rule_id, parsed_data):
+        categories = [
+            (name, [(item_hash(text), text) for text in items])
+            for name, items in parsed_data["categories"].items()
+        ]
+        record_snapshot(
+            db, rule_id, parsed_data["url"], parsed_data["title"], categories
+        )
 
-            db.commit()
-            print(f"Successfully saved rules from {parsed_data['url']}")
+    def _new_plan(self, parsed_data):
+        return {
+            # 번역 단계가 없으면 원문을 그대로 content_ko/name에 저장합니다.
+            "translations": parsed_data.get("translations", {}),
+            "category_inserts": [],
+            "category_updates": [],
+            "category_deletes": [],
+            "item_inserts": [],
+            "item_updates": [],
+            "item_deletes": [],
+            "stats": {
+                "inserted": 0,
+                "updated": 0,
+                "reordered": 0,
+                "deleted": 0,
+                "unchanged": 0,
+                "rule_ids": [],
+            },
+        }
+
+    def _insert_rule(self, db, parsed_data):
+        return db.execute(
+            insert(ExhibitionRule).returning(ExhibitionRule.id),
+            [{"url": parsed_data["url"], "title": parsed_data["title"]}],
+        ).scalar_one()
+
+    def _replace_rule(self, db, parsed_data):
+        plan = self._new_plan(parsed_data)
+        rule_ids = select(ExhibitionRule.id).where(
+            ExhibitionRule.url == parsed_data["url"]
+        )
+        category_ids = select(RuleCategory.id).where(
+            RuleCategory.exhibition_rule_id.in_(rule_ids)
+        )
+        no_sync = {"synchronize_session": False}
+        plan["stats"]["rule_ids"].extend(db.scalars(rule_ids).all())
+        db.execute(
+            delete(RuleItem).where(RuleItem.category_id.in_(category_ids)),
+            execution_options=no_sync,
+        )
+        db.execute(
+            delete(RuleCategory).where(RuleCategory.exhibition_rule_id.in_(rule_ids)),
+            execution_options=no_sync,
+        )
+        deleted = db.execute(
+            delete(ExhibitionRule).where(ExhibitionRule.url == parsed_data["url"]),
+            execution_options=no_sync,
+        ).rowcount
+        plan["stats"]["deleted"] += deleted
+
+        rule_id = self._insert_rule(db, parsed_data)
+        for cat_idx, (category_name, items) in enumerate(
+            parsed_data["categories"].items()
+        ):
+            self._plan_new_category(plan, category_name, cat_idx, items)
+        self._apply_plan(db, rule_id, plan)
+        return plan["stats"]
+
+    def _plan_new_category(self, plan, name, order_index, items):
+        plan["category_inserts"].append(
+            {
+                "name": plan["translations"].get(name, name),
+                "name_en": name,
+                "order_index": order_index,
+                "items": list(enumerate(items)),
+            }
+        )
+        plan["stats"]["inserted"] += 1 + len(items)
+
+    def _item_row(self, plan, category_id, text, order_index):
+        return {
+            "category_id": category_id,
+            "content_ko": plan["translations"].get(text, text),
+            "content_en": text,
+            "content_hash": item_hash(text),
+            "order_index": order_index,
+        }
+
+    def _batches(self, rows):
+        for start in range(0, len(rows), self.batch_size):
+            yield rows[start : start + self.batch_size]
+
+    def _apply_plan(self, db, rule_id, plan):
+        now = datetime.utcnow()
+        plan["stats"]["rule_ids"].append(rule_id)
+        no_sync = {"synchronize_session": False}
+
+        for ids in self._batches(plan["item_deletes"]):
+            db.execute(
+                delete(RuleItem).where(RuleItem.id.in_(ids)),
+                execution_options=no_sync,
+            )
+        for ids in self._batches(plan["category_deletes"]):
+            db.execute(
+                delete(RuleItem).where(RuleItem.category_id.in_(ids)),
+                execution_options=no_sync,
+            )
+            db.execute(
+                delete(RuleCategory).where(RuleCategory.id.in_(ids)),
+                execution_options=no_sync,
+            )
+
+        item_rows = list(plan["item_inserts"])
+        for batch in self._batches(plan["category_inserts"]):
+            # order_index는 규칙 안에서 유일하므로 RETURNING 결과를 그것으로 매칭합니다.
+            returned = db.execute(
+                insert(RuleCategory).returning(
+                    RuleCategory.id, RuleCategory.order_index
+                ),
+                [
+                    {
+                        "exhibition_rule_id": rule_id,
+                        "name": category["name"],
+                        "name_en": category["name_en"],
+                        "order_index": category["order_index"],
+                    }
+                    for category in batch
+                ],
+            ).all()
+            category_ids = {order_index: id_ for id_, order_index in returned}
+            for category in batch:
+                category_id = category_ids[category["order_index"]]
+                for idx, text in category["items"]:
+                    item_rows.append(self._item_row(plan, category_id, text, idx))
+
+        for batch in self._batches(item_rows):
+            db.execute(insert(RuleItem), batch)
+
+        for updates, model in (
+            (plan["category_updates"], RuleCategory),
+            (plan["item_updates"], RuleItem),
+        ):
+            for batch in self._batches(updates):
+                db.execute(update(model), [dict(row, updated_at=now) for row in batch])
+
+        stats = plan["stats"]
+        if (
+            stats["inserted"]
+            or stats["updated"]
+            or stats["reordered"]
+            or stats["deleted"]
+        ):
+            db.execute(
+                update(ExhibitionRule)
+                .where(ExhibitionRule.id == rule_id)
+                .values(updated_at=now)
+            )
+
+    def _reconcile_rule(self, db, parsed_data):
+        rule = (
+            db.query(ExhibitionRule)
+            .options(
+                selectinload(ExhibitionRule.categories).selectinload(
+                    RuleCategory.rule_items
+                )
+            )
+            .filter_by(url=parsed_data["url"])
+            .first()
+        )
+        if rule is None:
+            return self._replace_rule(db, parsed_data)
+
+        plan = self._new_plan(parsed_data)
+        stats = plan["stats"]
+        if rule.title != parsed_data["title"]:
+            db.execute(
+                update(ExhibitionRule)
+                .where(ExhibitionRule.id == rule.id)
+                .values(title=parsed_data["title"])
+            )
+            stats["updated"] += 1
+
+        existing = {}
+        for category in rule.categories:
+            # 번역된 뒤에는 name이 한국어이므로 원문(name_en)으로 매칭합니다.
+            source_name = category.name_en or category.name
+            if source_name in existing:
+                # 이전 버전에서 중복 저장된 카테고리는 정리합니다.
+                plan["category_deletes"].append(category.id)
+                stats["deleted"] += 1
+            else:
+                existing[source_name] = category
+
+        for cat_idx, (category_name, items) in enumerate(
+            parsed_data["categories"].items()
+        ):
+            category = existing.pop(category_name, None)
+            if category is None:
+                self._plan_new_category(plan, category_name, cat_idx, items)
+                continue
+            changes = {}
+            if category.order_index != cat_idx:
+                changes["order_index"] = cat_idx
+                stats["reordered"] += 1
+            translated = plan["translations"].get(category_name)
+            if translated and category.name != translated:
+                changes["name"] = translated
+                stats["updated"] += 1
+            if changes:
+                plan["category_updates"].append({"id": category.id, **changes})
+            self._plan_items(plan, category, items)
+
+        for category in existing.values():
+            plan["category_deletes"].append(category.id)
+            stats["deleted"] += 1
+
+        self._apply_plan(db, rule.id, plan)
+        return stats
+
+    def _translation_update(self, plan, row, text):
+        # 번역이 있을 때만 content_ko를 바꿉니다. 번역 단계를 끈 크롤링이 기존 번역을 덮어쓰지 않습니다.
+        translated = plan["translations"].get(text)
+        if translated and row.content_ko != translated:
+            return {"content_ko": translated}
+        return {}
+
+    def _plan_items(self, plan, category, items):
+        stats = plan["stats"]
+        wanted = [(idx, text, item_hash(text)) for idx, text in enumerate(items)]
+        remaining = {}
+        stored_hash = {}
+        for row in category.rule_items:
+            remaining[row.id] = row
+            stored_hash[row.id] = row.content_hash or item_hash(row.content_en or "")
+
+        # 1) 같은 내용이 같은 위치에 있으면 그대로 둡니다.
+        exact = {}
+        for row in remaining.values():
+            exact.setdefault((stored_hash[row.id], row.order_index), row)
+        pending = []
+        for idx, text, digest in wanted:
+            row = exact.pop((digest, idx), None)
+            if row is None:
+                pending.append((idx, text, digest))
+                continue
+            del remaining[row.id]
+            changes = self._translation_update(plan, row, text)
+            if row.content_hash is None:
+                changes["content_hash"] = digest
+            if changes:
+                plan["item_updates"].append({"id": row.id, **changes})
+            if "content_ko" in changes:
+                stats["updated"] += 1
+            else:
+                stats["unchanged"] += 1
+
+        # 2) 같은 내용이 다른 위치에 있으면 순서만 바꿉니다.
+        by_hash = {}
+        for row in remaining.values():
+            by_hash.setdefault(stored_hash[row.id], []).append(row)
+        unmatched = []
+        for idx, text, digest in pending:
+            rows = by_hash.get(digest)
+            if not rows:
+                unmatched.append((idx, text, digest))
+                continue
+            row = rows.pop(0)
+            del remaining[row.id]
+            plan["item_updates"].append(
+                {
+                    "id": row.id,
+                    "order_index": idx,
+                    "content_hash": digest,
+                    **self._translation_update(plan, row, text),
+                }
+            )
+            stats["reordered"] += 1
+
+        # 3) 같은 위치에서 내용이 바뀐 항목은 갱신하고, 나머지는 추가/삭제합니다.
+        by_position = {row.order_index: row for row in remaining.values()}
+        for idx, text, digest in unmatched:
+            row = by_position.pop(idx, None)
+            if row is None:
+                plan["item_inserts"].append(
+                    self._item_row(plan, category.id, text, idx)
+                )
+                stats["inserted"] += 1
+                continue
+            del remaining[row.id]
+            plan["item_updates"].append(
+                {
+                    "id": row.id,
+                    "content_ko": plan["translations"].get(text, text),
+                    "content_en": text,
+                    "content_hash": digest,
+                }
+            )
+            stats["updated"] += 1
 
+        for row in remaining.values():
+            plan["item_deletes"].append(row.id)
+            stats["deleted"] += 1
+
+    def crawl_and_save(self, urls, force=False, progress=None):
+        progress = progress or CrawlProgress()
+        states = {} if force else self.load_fetch_states(urls)
+        if self.max_workers <= 1 or len(urls) <= 1:
+            results = self._crawl_sequential(urls, states, progress)
+        else:
+            results = self._crawl_concurrent(urls, states, progress)
+        # ru_maxrss는 프로세스 전체의 최댓값이므로 이번 크롤링까지 포함한 최고치입니다.
+        peak = peak_memory_mb()
+        if peak is not None:
+            print(f"Peak memory: {peak} MB")
+            metrics.CRAWL_PEAK_MEMORY.set(peak)
+            progress.memory(peak)
+        return results
+
+    def _fetch(self, url, state, deadline_at, progress):
+        if progress.is_cancelled():
+            return {"url": url, "status": "cancelled"}
+        if deadline_at is not None and time.monotonic() >= deadline_at:
+            return {"url": url, "status": "timeout"}
+        progress.stage(url, "fetch")
+        start = time.perf_counter()
+        try:
+            fetched = self.fetch_if_changed(url, state, deadline_at)
+        except Exception as e:
+            fetched = {"url": url, "status": "failed", "error": str(e)}
+        progress.timing(url, "fetch", time.perf_counter() - start)
+        if fetched.get("error"):
+            progress.error(url, fetched["error"])
+            # 마감 시간에 걸려 중단된 요청은 실패가 아니라 시간 초과로 구분합니다.
+            if deadline_at is not None and time.monotonic() >= deadline_at:
+                fetched["status"] = "timeout"
+        return fetched
+
+    def _handle_page(self, fetched, progress):
+        url = fetched["url"]
+        body = fetched.pop("body", None)
+        if fetched["status"] == "failed":
+            print(f"Failed to fetch {url}")
+            return None
+        if fetched["status"] in ("cancelled", "timeout"):
+            print(f"Crawl {fetched['status']} before {url} finished")
+            return None
+        if fetched["status"] != "modified":
+            print(f"Unchanged since last crawl: {url}")
+            return None
+        try:
+            return self._parse_and_translate(url, body, progress)
+        except Exception as e:
+            # 한 페이지의 파싱/번역 오류로 작업 전체가 멈추지 않도록 이 URL만 실패로 처리합니다.
+            # 가져오기 상태를 기록하지 않으므로 다음 크롤링에서 다시 시도합니다.
+            print(f"Error processing {url}: {str(e)}")
+            progress.error(url, str(e))
+            fetched["status"] = "failed"
+            return None
+
+    def _parse_and_translate(self, url, body, progress):
+        progress.stage(url, "parse")
+        start = time.perf_counter()
+        parsed_data = self.fetcher.parse(url, body)
+        progress.timing(url, "parse", time.perf_counter() - start)
+        if not parsed_data["categories"]:
+            print(f"No categories found for {url}")
+            return None
+        if self.translation.enabled:
+            progress.stage(url, "translate")
+            start = time.perf_counter()
+            parsed_data = self.translation.translate_parsed(parsed_data)
+            progress.timing(url, "translate", time.perf_counter() - start)
+        return parsed_data
+
+    def _save(self, fetched, parsed_data, progress):
+        url = fetched["url"]
+        if fetched["status"] in ("failed", "cancelled", "timeout"):
+            progress.done(url, fetched["status"])
+            return fetched["status"]
+
+        progress.stage(url, "save")
+        start = time.perf_counter()
+        stats = None
+        try:
+            untranslated = 0
+            if parsed_data:
+                stats = self.write_rule(parsed_data)
+                print(f"Found {len(parsed_data['categories'])} categories")
+                untranslated = parsed_data.get("untranslated", 0)
+            if untranslated:
+                # 원문으로 저장한 문장이 있으면 본문 해시/ETag를 남기지 않아 다음 크롤링에서
+                # 페이지가 바뀐 것으로 보고 다시 번역합니다.
+                progress.error(url, f"{untranslated} texts left untranslated")
+            self.record_fetch_state(fetched, validators=not untranslated)
         except Exception as e:
-            db.rollback()
             print(f"Database error: {str(e)}")
+            progress.error(url, str(e))
+            progress.done(url, "failed")
+            return "failed"
         finally:
-            db.close()
+            progress.timing(url, "save", time.perf_counter() - start)
+
+        if stats is not None:
+            # 본문 해시는 바뀌었어도(광고, 타임스탬프 등) 규칙 행이 그대로면 변경 없음입니다.
+            written = any(
+                stats[key] for key in ("inserted", "updated", "reordered", "deleted")
+            )
+            status = "saved" if written else "unchanged"
+        elif fetched["status"] == "modified":
+            status = "empty"
+        else:
+            status = fetched["status"]
+        progress.done(url, status)
+        return status
 
-    def crawl_and_save(self, urls):
+    def _crawl_sequential(self, urls, states, progress):
+        results = {}
+        deadline_at = time.monotonic() + self.deadline if self.deadline else None
         for url in urls:
             print(f"Crawling {url}...")
-            html = self.fetch_page(url)
-            if html:
-                parsed_data = self.parse_page(html, url)
-                if parsed_data["categories"]:
-                    self.save_to_database(parsed_data)
-                    print(f"Found {len(parsed_data['categories'])} categories")
-                else:
-                    print(f"No categories found for {url}")
-            else:
-                print(f"Failed to fetch {url}")
+            fetched = self._fetch(url, states.get(url), deadline_at, progress)
+            parsed_data = self._handle_page(fetched, progress)
+            results[url] = self._save(fetched, parsed_data, progress)
+        return results
+
+    def _crawl_concurrent(self, urls, states, progress):
+        results = {url: "pending" for url in urls}
+        deadline_at = time.monotonic() + self.deadline if self.deadline else None
+
+        fetch_pool = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(urls)),
+            thread_name_prefix="crawl-fetch",
+        )
+        # 저장은 단일 워커에서 순서대로 처리하여 DB 쓰기 경합을 피합니다.
+        save_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="crawl-save")
+        save_futures = {}
+        try:
+            fetches = {}
+            for url in urls:
+                print(f"Crawling {url}...")
+                future = fetch_pool.submit(
+                    self._fetch, url, states.get(url), deadline_at, progress
+                )
+                fetches[future] = url
+
+            pending = set(fetches)
+            while pending:
+                # 취소와 마감 시간을 주기적으로 확인하기 위해 짧게 나눠서 기다립니다.
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = fetches[future]
+                    fetched = future.result()
+                    parsed_data = self._handle_page(fetched, progress)
+                    save_future = save_pool.submit(
+                        self._save, fetched, parsed_data, progress
+                    )
+                    save_futures[save_future] = url
+
+                expired = deadline_at is not None and time.monotonic() >= deadline_at
+                if pending and (expired or progress.is_cancelled()):
+                    status = "timeout" if expired else "cancelled"
+                    for future in pending:
+                        future.cancel()
+                        url = fetches[future]
+                        results[url] = status
+                        progress.done(url, status)
+                        print(f"Crawl {status} before {url} finished")
+                    break
 
+            for future in as_completed(save_futures):
+                url = save_futures[future]
+                try:
+                    results[url] = future.result()
+                except Exception as e:
+                    results[url] = "failed"
+                    print(f"Error saving {url}: {str(e)}")
+        finally:
+            fetch_pool.shutdown(wait=False, cancel_futures=True)
+            save_pool.shutdown(wait=True)
+
+        return results
 
-def main():
-    urls = [
-        "https://gsma.my.site.com/mwcoem/s/New%20for%202026",
-        "https://gsma.my.site.com/mwcoem/s/Event%20Rules%20and%20Regulations",
-        "https://gsma.my.site.com/mwcoem/s/Stand%20Build%20Rules%20and%20Regulations",
-    ]
 
+def main():
+    init_database()
     crawler = ExhibitionRuleCrawler()
-    crawler.crawl_and_save(urls)
+    crawler.crawl_and_save(CRAWL_URLS)
 
 
 if __name__ == "__main__":
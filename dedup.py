@@ -0,0 +1,451 @@
+import argparse
+import hashlib
+import re
+import struct
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.orm import aliased
+from models import ItemLshBucket, RuleCategory, RuleItem, get_session, init_database
+from config import DEDUP_THRESHOLD
+
+# MinHash 서명 길이와 LSH 밴드 구성입니다. 밴드 16개 × 4행이면 자카드 유사도 0.5 부근에서
+# 후보가 되기 시작하고(약 64%) 0.7 이상은 거의 항상(99% 이상) 후보가 됩니다.
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+# IN 절 하나에 넣는 값 개수 (SQLite 바인드 변수 제한 이하)
+LOOKUP_BATCH_SIZE = 500
+REBUILD_CHUNK_SIZE = 2000
+
+# 서명의 각 자리는 shake_128 출력의 서로 다른 8바이트 구간을 독립된 해시 함수로 씁니다.
+# 본문마다 결과가 같아야 DB에 저장된 버킷과 비교할 수 있으므로 난수 시드는 쓰지 않습니다.
+_SIGNATURE = struct.Struct(f"<{NUM_PERM}Q")
+_WORD = re.compile(r"\w+")
+
+
+def item_text(content_en, content_ko):
+    # 번역 여부와 관계없이 비교할 수 있도록 원문을 기준으로 합니다.
+    return content_en or content_ko or ""
+
+
+def shingles(text):
+    # 소문자 단어 2-gram 집합입니다. 한 단어짜리 항목은 그 단어 하나를 씁니다.
+    words = _WORD.findall(text.lower())
+    if len(words) < 2:
+        return set(words)
+    return {f"{first} {second}" for first, second in zip(words, words[1:])}
+
+
+def jaccard(left, right):
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def minhash(shingle_set):
+    hashes = [
+        _SIGNATURE.unpack(
+            hashlib.shake_128(shingle.encode("utf-8")).digest(_SIGNATURE.size)
+        )
+        for shingle in shingle_set
+    ]
+    return list(map(min, zip(*hashes)))
+
+
+def band_buckets(signature):
+    # 밴드 번호를 앞에 붙여 서로 다른 밴드의 값이 같은 버킷에 들어가지 않게 합니다.
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS : (band + 1) * ROWS]
+        digest = hashlib.blake2b(
+            ",".join(map(str, rows)).encode("ascii"), digest_size=10
+        ).hexdigest()
+        buckets.append(f"{band:02d}{digest}")
+    return buckets
+
+
+def _batches(values):
+    values = list(values)
+    for start in range(0, len(values), LOOKUP_BATCH_SIZE):
+        yield values[start : start + LOOKUP_BATCH_SIZE]
+
+
+def _index_missing(db, shingle_sets):
+    # 이미 버킷이 있는 본문 해시는 건너뛰고 새 본문만 MinHash를 계산해 버킷을 INSERT 합니다.
+    # 색인된 본문 해시 집합을 반환합니다.
+    indexed = set()
+    for batch in _batches(shingle_sets):
+        indexed.update(
+            db.scalars(
+                select(ItemLshBucket.content_hash)
+                .where(ItemLshBucket.content_hash.in_(batch))
+                .distinct()
+            )
+        )
+    rows = []
+    for content_hash, shingle_set in shingle_sets.items():
+        if content_hash in indexed or not shingle_set:
+            continue
+        indexed.add(content_hash)
+        rows.extend(
+            {"content_hash": content_hash, "bucket": bucket}
+            for bucket in band_buckets(minhash(shingle_set))
+        )
+    if rows:
+        db.execute(insert(ItemLshBucket), rows)
+    return indexed
+
+
+def _candidate_hashes(db, content_hashes):
+    # 버킷을 하나라도 공유하는 본문 해시만 후보로 돌려줍니다. 새 본문의 버킷은 먼저 저장되어 있으므로
+    # 버킷 테이블 자기 조인 한 번으로 찾습니다(인덱스 조회라 전체 항목 수와 무관).
+    other = aliased(ItemLshBucket)
+    candidates = {content_hash: set() for content_hash in content_hashes}
+    for batch in _batches(content_hashes):
+        for source, content_hash in db.execute(
+            select(ItemLshBucket.content_hash, other.content_hash)
+            .join(other, other.bucket == ItemLshBucket.bucket)
+            .where(ItemLshBucket.content_hash.in_(batch))
+            .distinct()
+        ):
+            candidates[source].add(content_hash)
+    return candidates
+
+
+def _oldest_items(db, content_hashes):
+    # 본문 해시별로 가장 먼저 저장된 항목(id, 대표 id, 본문)을 읽습니다.
+    # 같은 해시의 나머지 항목은 이미 그 항목 쪽으로 묶여 있습니다.
+    oldest_ids = []
+    for batch in _batches(content_hashes):
+        oldest_ids.extend(
+            db.scalars(
+                select(func.min(RuleItem.id))
+                .where(RuleItem.content_hash.in_(batch))
+                .group_by(RuleItem.content_hash)
+            )
+        )
+    oldest = {}
+    for batch in _batches(oldest_ids):
+        for row in db.execute(
+            select(
+                RuleItem.id,
+                RuleItem.canonical_item_id,
+                RuleItem.content_hash,
+                RuleItem.content_en,
+                RuleItem.content_ko,
+            ).where(RuleItem.id.in_(batch))
+        ):
+            oldest[row.content_hash] = row
+    return oldest
+
+
+def update_links(db, item_ids, removed_ids=(), threshold=DEDUP_THRESHOLD):
+    # item_ids(새로 저장되었거나 본문이 바뀐 항목)와 그 항목 또는 removed_ids(삭제된 항목)를
+    # 대표로 삼던 항목의 canonical_item_id를 다시 계산합니다.
+    # 새로 연결할 때는 id가 더 작은 항목 쪽으로만 묶으므로 순환이 생기지 않습니다.
+    # 링크가 바뀐 항목이 속한 규칙 id 목록을 반환합니다.
+    targets = set(item_ids)
+    for batch in _batches(targets | set(removed_ids)):
+        targets.update(
+            db.scalars(select(RuleItem.id).where(RuleItem.canonical_item_id.in_(batch)))
+        )
+    rows = []
+    for batch in _batches(targets):
+        rows.extend(
+            db.execute(
+                select(
+                    RuleItem.id,
+                    RuleItem.canonical_item_id,
+                    RuleItem.content_hash,
+                    RuleItem.content_en,
+                    RuleItem.content_ko,
+                ).where(RuleItem.id.in_(batch))
+            ).all()
+        )
+    if not rows:
+        return []
+    rows.sort(key=lambda row: row.id)
+
+    shingle_sets = {}
+    for row in rows:
+        if row.content_hash and row.content_hash not in shingle_sets:
+            shingle_sets[row.content_hash] = shingles(
+                item_text(row.content_en, row.content_ko)
+            )
+    candidates = _candidate_hashes(db, _index_missing(db, shingle_sets))
+    oldest = _oldest_items(
+        db, set().union(*candidates.values()) if candidates else set()
+    )
+    for content_hash, row in oldest.items():
+        if content_hash not in shingle_sets:
+            shingle_sets[content_hash] = shingles(
+                item_text(row.content_en, row.content_ko)
+            )
+    # 유사도는 본문 해시 쌍마다 한 번만 계산합니다.
+    similar = {
+        content_hash: [
+            oldest[other]
+            for other in others
+            if other in oldest
+            and (
+                other == content_hash
+                or jaccard(shingle_sets[content_hash], shingle_sets[other]) >= threshold
+            )
+        ]
+        for content_hash, others in candidates.items()
+    }
+
+    links = {}
+    changed = []
+    for row in rows:
+        canonical = None
+        for match in similar.get(row.content_hash, ()):
+            if match.id >= row.id:
+                continue
+            if match.id in links:
+                root = links[match.id] or match.id
+            else:
+                root = match.canonical_item_id or match.id
+            canonical = root if canonical is None else min(canonical, root)
+        links[row.id] = canonical
+        if canonical != row.canonical_item_id:
+            changed.append({"id": row.id, "canonical_item_id": canonical})
+
+    if not changed:
+        return []
+    _set_links(db, changed)
+    return _rule_ids(db, [row["id"] for row in changed])
+
+
+def _set_links(db, changed):
+    # 같은 대표로 묶이는 항목을 UPDATE 한 번으로 바꿉니다. 행마다 UPDATE하는 것보다 훨씬 빠릅니다.
+    groups = {}
+    for row in changed:
+        groups.setdefault(row["canonical_item_id"], []).append(row["id"])
+    for canonical, item_ids in groups.items():
+        for batch in _batches(item_ids):
+            db.execute(
+                update(RuleItem)
+                .where(RuleItem.id.in_(batch))
+                .values(canonical_item_id=canonical),
+                execution_options={"synchronize_session": False},
+            )
+
+
+def _rule_ids(db, item_ids):
+    rule_ids = set()
+    for batch in _batches(item_ids):
+        rule_ids.update(
+            db.scalars(
+                select(RuleCategory.exhibition_rule_id)
+                .join(RuleItem, RuleItem.category_id == RuleCategory.id)
+                .where(RuleItem.id.in_(batch))
+            )
+        )
+    return sorted(rule_ids)
+
+
+def prune_buckets(db, content_hashes):
+    # 더 이상 어떤 항목도 쓰지 않는 본문 해시의 버킷을 지웁니다.
+    for batch in _batches(content_hashes):
+        alive = set(
+            db.scalars(
+                select(RuleItem.content_hash)
+                .where(RuleItem.content_hash.in_(batch))
+                .distinct()
+            )
+        )
+        stale = [content_hash for content_hash in batch if content_hash not in alive]
+        if stale:
+            db.execute(
+                delete(ItemLshBucket).where(ItemLshBucket.content_hash.in_(stale))
+            )
+
+
+def relink_page(db, previous, dependents, current, threshold=DEDUP_THRESHOLD):
+    # 페이지 하나를 저장한 뒤 링크를 맞춥니다.
+    # previous: 저장 전 페이지 항목 (id, content_hash, canonical_item_id)
+    # dependents: 저장 전 페이지 항목을 대표로 삼던 항목 (id, canonical_item_id)
+    # current: 저장 후 페이지 항목 (id, content_hash, canonical_item_id)
+    # replace 모드처럼 같은 본문이 새 id로 다시 저장되면 유사도 계산 없이 링크만 새 id로 옮기고,
+    # 본문 해시가 새로 생기거나 바뀐 항목만 update_links로 다시 묶습니다.
+    before = {row.id: row for row in previous}
+    after = {row.id: row for row in current}
+    stored = {row.id: row.canonical_item_id for row in dependents}
+    stored.update((row.id, row.canonical_item_id) for row in current)
+    # 지워졌거나 같은 id에 다른 본문이 들어간(SQLite는 id를 재사용) 이전 항목입니다.
+    gone = {
+        item_id
+        for item_id, row in before.items()
+        if item_id not in after or after[item_id].content_hash != row.content_hash
+    }
+    old_by_hash = {}
+    for item_id in sorted(gone):
+        old_by_hash.setdefault(before[item_id].content_hash, []).append(item_id)
+
+    moved = {}
+    paired = []
+    relink = set()
+    for item_id, row in sorted(after.items()):
+        if item_id in before and item_id not in gone:
+            # 그대로 남은 항목은 링크도 그대로입니다. 같은 id로 다시 INSERT된 경우만 되살립니다.
+            if row.canonical_item_id != before[item_id].canonical_item_id:
+                paired.append((item_id, item_id))
+            continue
+        olds = old_by_hash.get(row.content_hash)
+        if row.content_hash and olds:
+            old_id = olds.pop(0)
+            moved[old_id] = item_id
+            paired.append((old_id, item_id))
+        else:
+            relink.add(item_id)
+    # 페이지 안에서 같은 본문이 줄어든 경우 남는 이전 항목은 같은 본문의 새 항목으로 옮깁니다.
+    for old_id, item_id in paired:
+        for extra in old_by_hash.get(before[old_id].content_hash, ()):
+            moved.setdefault(extra, item_id)
+
+    links = {}
+    unresolved = gone - set(moved)
+    for old_id, item_id in paired:
+        canonical = before[old_id].canonical_item_id
+        canonical = moved.get(canonical, canonical)
+        if canonical in unresolved:
+            relink.add(item_id)
+            unresolved.add(old_id)
+        else:
+            links[item_id] = None if canonical == item_id else canonical
+    for row in dependents:
+        if row.id in gone or row.canonical_item_id not in moved:
+            continue
+        if row.canonical_item_id in unresolved:
+            continue
+        item_id = moved[row.canonical_item_id]
+        canonical = links.get(item_id) or item_id
+        links[row.id] = None if canonical == row.id else canonical
+
+    changed = [
+        {"id": item_id, "canonical_item_id": canonical}
+        for item_id, canonical in links.items()
+        if item_id not in relink and canonical != stored.get(item_id)
+    ]
+    rule_ids = set()
+    if changed:
+        _set_links(db, changed)
+        rule_ids.update(_rule_ids(db, [row["id"] for row in changed]))
+    if relink or unresolved:
+        rule_ids.update(update_links(db, relink, unresolved, threshold))
+    prune_buckets(
+        db,
+        {row.content_hash for row in previous if row.content_hash}
+        - {row.content_hash for row in current},
+    )
+    return sorted(rule_ids)
+
+
+def collapsed_ids(rules):
+    # 표시 순서대로 묶음(대표 id)마다 처음 나오는 항목만 남기고 나머지 id를 돌려줍니다.
+    # 대표 항목이 목록에 없어도 같은 묶음끼리는 접힙니다.
+    seen = set()
+    collapsed = set()
+    for rule in rules:
+        for category in rule.categories:
+            for item in category.rule_items:
+                cluster = item.canonical_item_id or item.id
+                if cluster in seen:
+                    collapsed.add(item.id)
+                else:
+                    seen.add(cluster)
+    return collapsed
+
+
+def rebuild(threshold=DEDUP_THRESHOLD):
+    # 버킷과 링크를 모두 지우고 id 순서대로 다시 만듭니다. 청크마다 커밋합니다.
+    db = get_session()
+    try:
+        db.execute(delete(ItemLshBucket))
+        db.execute(update(RuleItem).values(canonical_item_id=None))
+        db.commit()
+        last_id = 0
+        while True:
+            rows = db.execute(
+                select(
+                    RuleItem.id,
+                    RuleItem.content_hash,
+                    RuleItem.content_en,
+                    RuleItem.content_ko,
+                )
+                .where(RuleItem.id > last_id)
+                .order_by(RuleItem.id)
+                .limit(REBUILD_CHUNK_SIZE)
+            ).all()
+            if not rows:
+                break
+            # 본문 해시가 없는 이전 데이터는 크롤러와 같은 방식(원문 SHA-256)으로 채웁니다.
+            missing = [
+                {
+                    "id": row.id,
+                    "content_hash": hashlib.sha256(
+                        item_text(row.content_en, row.content_ko).encode("utf-8")
+                    ).hexdigest(),
+                }
+                for row in rows
+                if not row.content_hash
+            ]
+            if missing:
+                db.execute(update(RuleItem), missing)
+            update_links(db, [row.id for row in rows], threshold=threshold)
+            db.commit()
+            last_id = rows[-1].id
+            print(f"{last_id}번 항목까지 처리")
+        linked = db.scalar(
+            select(func.count()).where(RuleItem.canonical_item_id.isnot(None))
+        )
+        return linked
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def cluster_stats(limit=10):
+    db = get_session()
+    try:
+        sizes = db.execute(
+            select(RuleItem.canonical_item_id, func.count())
+            .where(RuleItem.canonical_item_id.isnot(None))
+            .group_by(RuleItem.canonical_item_id)
+            .order_by(func.count().desc())
+        ).all()
+        top = []
+        for canonical_id, count in sizes[:limit]:
+            item = db.get(RuleItem, canonical_id)
+            text = item_text(item.content_en, item.content_ko) if item else ""
+            top.append((canonical_id, count + 1, text))
+        return {
+            "clusters": len(sizes),
+            "duplicates": sum(count for _, count in sizes),
+            "top": top,
+        }
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="거의 같은 규칙 항목 묶기")
+    parser.add_argument("command", choices=("rebuild", "stats"))
+    parser.add_argument("--threshold", type=float, default=DEDUP_THRESHOLD)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    init_database()
+    if args.command == "rebuild":
+        linked = rebuild(args.threshold)
+        print(f"재구성 완료: 중복 항목 {linked}개")
+    stats = cluster_stats(args.limit)
+    print(f"묶음 {stats['clusters']}개, 중복 항목 {stats['duplicates']}개")
+    for canonical_id, size, text in stats["top"]:
+        print(f"{size:6d}  #{canonical_id}  {text[:80]}")
+
+
+if __name__ == "__main__":
+    main()
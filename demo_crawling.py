@@ -1,5 +1,6 @@
 from crawler import ExhibitionRuleCrawler
 from init_db import setup_database
+from config import CRAWL_URLS
 
 
 def demo_crawling():
@@ -11,16 +12,12 @@ def demo_crawling():
     print()
 
     print("2. 크롤링 시작...")
-    urls = [
-        "https://gsma.my.site.com/mwcoem/s/New%20for%202026",
-        "https://gsma.my.site.com/mwcoem/s/Event%20Rules%20and%20Regulations",
-        "https://gsma.my.site.com/mwcoem/s/Stand%20Build%20Rules%20and%20Regulations",
-    ]
+    urls = CRAWL_URLS
 
     crawler = ExhibitionRuleCrawler()
 
     for i, url in enumerate(urls, 1):
-        print(f"  {i}/3 크롤링 중: {url}")
+        print(f"  {i}/{len(urls)} 크롤링 중: {url}")
         html = crawler.fetch_page(url)
         if html:
             parsed_data = crawler.parse_page(html, url)
@@ -0,0 +1,179 @@
+import argparse
+import csv
+import io
+import json
+import sys
+import zlib
+from datetime import datetime, timezone
+from sqlalchemy import select, or_
+from models import ExhibitionRule, RuleCategory, RuleItem, get_session
+from config import EXPORT_BATCH_SIZE
+
+EXPORT_FORMATS = ("ndjson", "csv")
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    # text/* 타입에는 starlette가 charset=utf-8을 붙입니다.
+    "csv": "text/csv",
+}
+EXPORT_COLUMNS = (
+    "rule_id",
+    "rule_title",
+    "rule_url",
+    "category_id",
+    "category_name",
+    "category_name_en",
+    "category_order",
+    "item_id",
+    "item_order",
+    "content_ko",
+    "content_en",
+    "content_hash",
+    "canonical_item_id",
+    "rule_updated_at",
+    "category_updated_at",
+    "item_updated_at",
+)
+
+
+def naive_utc(value):
+    # DB에는 UTC 기준 naive datetime이 저장되어 있으므로 시간대가 있는 값은 맞춰 줍니다.
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def export_statement(updated_since=None):
+    # 규칙 → 카테고리 → 항목을 조인 한 번으로 항목당 한 행씩 읽습니다.
+    # 항목이 없는 카테고리나 카테고리가 없는 규칙도 빈 값으로 한 행씩 나옵니다.
+    statement = (
+        select(
+            ExhibitionRule.id,
+            ExhibitionRule.title,
+            ExhibitionRule.url,
+            RuleCategory.id,
+            RuleCategory.name,
+            RuleCategory.name_en,
+            RuleCategory.order_index,
+            RuleItem.id,
+            RuleItem.order_index,
+            RuleItem.content_ko,
+            RuleItem.content_en,
+            RuleItem.content_hash,
+            RuleItem.canonical_item_id,
+            ExhibitionRule.updated_at,
+            RuleCategory.updated_at,
+            RuleItem.updated_at,
+        )
+        .outerjoin(RuleCategory, RuleCategory.exhibition_rule_id == ExhibitionRule.id)
+        .outerjoin(RuleItem, RuleItem.category_id == RuleCategory.id)
+        .order_by(
+            ExhibitionRule.id,
+            RuleCategory.order_index,
+            RuleCategory.id,
+            RuleItem.order_index,
+            RuleItem.id,
+        )
+    )
+    updated_since = naive_utc(updated_since)
+    if updated_since is not None:
+        # 증분 추출: 항목이나 상위 카테고리/규칙이 바뀐 행만 내보냅니다. 삭제된 행은 포함되지 않습니다.
+        statement = statement.where(
+            or_(
+                ExhibitionRule.updated_at > updated_since,
+                RuleCategory.updated_at > updated_since,
+                RuleItem.updated_at > updated_since,
+            )
+        )
+    return statement
+
+
+def iter_row_batches(updated_since=None, batch_size=EXPORT_BATCH_SIZE):
+    # yield_per는 서버 측 커서(stream_results)를 사용하므로 테이블 크기와 관계없이
+    # 한 번에 batch_size 행만 메모리에 올라옵니다.
+    db = get_session()
+    try:
+        result = db.execute(
+            export_statement(updated_since).execution_options(yield_per=batch_size)
+        )
+        for rows in result.partitions():
+            yield [
+                [
+                    value.isoformat() if isinstance(value, datetime) else value
+                    for value in row
+                ]
+                for row in rows
+            ]
+    finally:
+        db.close()
+
+
+def encode_ndjson(batches):
+    for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+
+def encode_csv(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def gzip_chunks(chunks, level=6):
+    # gzip 헤더를 포함한 스트림 압축입니다(wbits=31). 전체 결과를 모으지 않습니다.
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(fmt="ndjson", updated_since=None, compress=False):
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    encode = encode_csv if fmt == "csv" else encode_ndjson
+    chunks = encode(iter_row_batches(updated_since))
+    return gzip_chunks(chunks) if compress else chunks
+
+
+def export_filename(fmt, compress=False):
+    name = f"exhibition_rules_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return f"{name}.gz" if compress else name
+
+
+def main():
+    parser = argparse.ArgumentParser(description="규칙 트리 대량 내보내기")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument("--gzip", action="store_true", help="gzip으로 압축")
+    parser.add_argument(
+        "--updated-since",
+        type=datetime.fromisoformat,
+        help="이 시각(UTC, ISO 8601) 이후 바뀐 행만 내보냅니다",
+    )
+    parser.add_argument("-o", "--output", help="출력 파일 (기본: 표준 출력)")
+    args = parser.parse_args()
+
+    # 다음 증분 추출의 --updated-since로 쓸 수 있도록 시작 시각을 기록합니다.
+    watermark = datetime.utcnow().isoformat()
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in export_chunks(args.format, args.updated_since, args.gzip):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+    print(f"내보내기 완료 (다음 증분 기준 시각: {watermark})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
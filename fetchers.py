@@ -0,0 +1,361 @@
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, unquote, quote
+import metrics
+from crawler import ExhibitionRuleCrawler, content_hash, item_hash
+from config import (
+    CRAWL_URLS,
+    FETCHER_BACKEND,
+    FETCHER_RECORD,
+    FETCHER_CASSETTE_DIR,
+    SALESFORCE_CONTENT_URL,
+    SALESFORCE_CMS_CHANNEL,
+)
+
+BLOCK_RE = re.compile(r"<(li|p)\b[^>]*>(.*?)</\1>", re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r"<[^>]+>")
+
+
+class HtmlFetcher:
+    # 렌더링된 HTML 셸을 받아 BeautifulSoup 파서(parse_page)로 처리합니다.
+    name = "html"
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    def source_url(self, url):
+        return url
+
+    def content_hash(self, body):
+        return content_hash(body)
+
+    def fetch(self, url, state=None, deadline_at=None):
+        headers = {}
+        if state:
+            if state.get("etag"):
+                headers["If-None-Match"] = state["etag"]
+            if state.get("last_modified"):
+                headers["If-Modified-Since"] = state["last_modified"]
+
+        try:
+            response = self.crawler._get(self.source_url(url), deadline_at, headers)
+        except Exception as e:
+            print(f"Error fetching {url}: {str(e)}")
+            return {"url": url, "status": "failed", "error": str(e)}
+
+        if response.status_code == 304:
+            return {"url": url, "status": "not_modified"}
+
+        response.encoding = "utf-8"
+        body = response.text
+        fetched = {
+            "url": url,
+            "body": body,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_hash": self.content_hash(body),
+        }
+        if state and state.get("content_hash") == fetched["content_hash"]:
+            fetched["status"] = "unchanged"
+        else:
+            fetched["status"] = "modified"
+        return fetched
+
+    def parse(self, url, body):
+        return self.crawler.parse_page(body, url)
+
+
+def slugify(page):
+    return re.sub(r"[^a-z0-9]+", "-", page.lower()).strip("-")
+
+
+def node_blocks(node):
+    # CMS 콘텐츠 노드 하나를 항목 텍스트 목록으로 바꿉니다.
+    # RichText는 이스케이프된 HTML 조각이므로 <li>/<p>만 정규식으로 잘라냅니다.
+    if not isinstance(node, dict) or not node.get("value"):
+        return []
+    value = node["value"]
+    if node.get("nodeType") == "RichText":
+        value = html.unescape(value)
+        blocks = [match.group(2) for match in BLOCK_RE.finditer(value)] or [value]
+    else:
+        blocks = value.splitlines()
+    texts = (" ".join(html.unescape(TAG_RE.sub(" ", b)).split()) for b in blocks)
+    return [text for text in texts if text]
+
+
+def load_content_payload(body, url):
+    # 세션이 끊기면 로그인 페이지(HTML)가, API 오류면 [{"errorCode", "message"}] 목록이 옵니다.
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise ValueError(f"CMS response for {url} is not JSON (login redirect?)")
+    if isinstance(payload, list) and payload and isinstance(payload[0], dict):
+        error = payload[0]
+        if "errorCode" in error:
+            raise ValueError(
+                f"CMS error for {url}: {error['errorCode']}: {error.get('message')}"
+            )
+    if not isinstance(payload, dict):
+        raise ValueError(
+            f"CMS response for {url} is a {type(payload).__name__}, not an object"
+        )
+    return payload
+
+
+def parse_content_payload(payload, url):
+    # CMS 전달 API 응답(items[].title, items[].contentNodes)을
+    # parse_page와 같은 {title, url, categories} 구조로 바꿉니다.
+    entries = payload.get("items") or payload.get("contents") or []
+    categories = {}
+    for entry in entries:
+        nodes = entry.get("contentNodes") or {}
+        name = entry.get("title") or " ".join(node_blocks(nodes.get("title")))
+        if not name:
+            continue
+        items = []
+        for key, node in nodes.items():
+            if key != "title":
+                items.extend(node_blocks(node))
+        if items:
+            categories.setdefault(name, []).extend(items)
+
+    title = payload.get("title") or payload.get("pageTitle")
+    if not title:
+        title = unquote(urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1])
+    return {"title": title or "Unknown Title", "url": url, "categories": categories}
+
+
+class SalesforceContentFetcher(HtmlFetcher):
+    # Experience Cloud 페이지의 HTML 셸 대신 CMS JSON 콘텐츠를 직접 요청합니다.
+    name = "salesforce"
+
+    def __init__(
+        self,
+        crawler,
+        content_url=SALESFORCE_CONTENT_URL,
+        channel=SALESFORCE_CMS_CHANNEL,
+    ):
+        # 채널이 비면 .../channels//contents 같은 잘못된 주소로 모든 페이지가 실패하므로
+        # 크롤링을 시작하기 전에 설정 오류로 알립니다.
+        if "{channel}" in content_url and not channel:
+            raise ValueError(
+                "SALESFORCE_CMS_CHANNEL is not set (required by FETCHER_BACKEND=salesforce)"
+            )
+        super().__init__(crawler)
+        self.content_url = content_url
+        self.channel = channel
+
+    def source_url(self, url):
+        parts = urlsplit(url)
+        segments = [segment for segment in parts.path.split("/") if segment]
+        page = unquote(segments[-1]) if segments else ""
+        return self.content_url.format(
+            origin=f"{parts.scheme}://{parts.netloc}",
+            site=segments[0] if segments else "",
+            channel=self.channel,
+            page=quote(page),
+            slug=slugify(page),
+        )
+
+    def content_hash(self, body):
+        return item_hash(body)
+
+    def parse(self, url, body):
+        parser = "salesforce_json"
+        payload = load_content_payload(body, url)
+        with metrics.traced(metrics.PARSE_SECONDS, "parse", parser=parser):
+            try:
+                parsed_data = parse_content_payload(payload, url)
+            except (KeyError, TypeError, AttributeError) as e:
+                raise ValueError(f"Unexpected CMS content shape for {url}: {e!r}")
+        metrics.PARSED_CATEGORIES.inc(len(parsed_data["categories"]), parser=parser)
+        metrics.PARSED_ITEMS.inc(
+            sum(len(items) for items in parsed_data["categories"].values()),
+            parser=parser,
+        )
+        return parsed_data
+
+
+def cassette_path(directory, url):
+    return os.path.join(
+        directory, hashlib.sha256(url.encode("utf-8")).hexdigest()[:16] + ".json"
+    )
+
+
+def load_cassette(directory):
+    entries = []
+    if not os.path.isdir(directory):
+        return entries
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                entries.append(json.load(f))
+    return entries
+
+
+class RecordingFetcher:
+    # 실제 백엔드로 가져온 응답을 카세트 디렉터리에 URL별 JSON 파일로 남깁니다.
+    def __init__(self, inner, directory=FETCHER_CASSETTE_DIR):
+        self.inner = inner
+        self.name = inner.name
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def fetch(self, url, state=None, deadline_at=None):
+        fetched = self.inner.fetch(url, state, deadline_at)
+        if fetched.get("body") is not None:
+            entry = {
+                "url": url,
+                "source_url": self.inner.source_url(url),
+                "backend": self.inner.name,
+                "etag": fetched.get("etag"),
+                "last_modified": fetched.get("last_modified"),
+                "body": fetched["body"],
+            }
+            with self._lock:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(
+                    cassette_path(self.directory, url), "w", encoding="utf-8"
+                ) as f:
+                    json.dump(entry, f, ensure_ascii=False)
+        return fetched
+
+    def parse(self, url, body):
+        return self.inner.parse(url, body)
+
+
+class ReplayFetcher:
+    # 네트워크 없이 카세트에 기록된 응답으로 전체 파이프라인을 실행합니다.
+    name = "replay"
+
+    def __init__(self, crawler, directory=FETCHER_CASSETTE_DIR):
+        self.directory = directory
+        # 재생은 기록된 본문을 파싱만 하므로 CMS 주소(채널)가 필요 없습니다.
+        self.backends = {
+            "html": HtmlFetcher(crawler),
+            "salesforce": SalesforceContentFetcher(crawler, content_url=""),
+        }
+        self._backend_for = {}
+
+    def source_url(self, url):
+        return url
+
+    def fetch(self, url, state=None, deadline_at=None):
+        path = cassette_path(self.directory, url)
+        if not os.path.exists(path):
+            return {"url": url, "status": "failed", "error": f"no recording for {url}"}
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+
+        if state and entry.get("etag") and state.get("etag") == entry["etag"]:
+            return {"url": url, "status": "not_modified"}
+        backend = self.backends[entry["backend"]]
+        self._backend_for[url] = backend
+        fetched = {
+            "url": url,
+            "body": entry["body"],
+            "etag": entry.get("etag"),
+            "last_modified": entry.get("last_modified"),
+            "content_hash": backend.content_hash(entry["body"]),
+        }
+        if state and state.get("content_hash") == fetched["content_hash"]:
+            fetched["status"] = "unchanged"
+        else:
+            fetched["status"] = "modified"
+        return fetched
+
+    def parse(self, url, body):
+        return self._backend_for.get(url, self.backends["html"]).parse(url, body)
+
+
+def make_fetcher(crawler, backend=FETCHER_BACKEND, record=FETCHER_RECORD):
+    if backend == "replay":
+        return ReplayFetcher(crawler)
+    if backend == "salesforce":
+        fetcher = SalesforceContentFetcher(crawler)
+    else:
+        fetcher = HtmlFetcher(crawler)
+    if record:
+        fetcher = RecordingFetcher(fetcher)
+    return fetcher
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # 기록된 응답을 원래 경로 그대로 돌려주는 로컬 대역 서버입니다.
+    entries = {}
+
+    def do_GET(self):
+        entry = self.entries.get(self.path)
+        if entry is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        etag = entry.get("etag") or '"{}"'.format(item_hash(entry["body"])[:16])
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        body = entry["body"].encode("utf-8")
+        content_type = (
+            "application/json" if entry["backend"] == "salesforce" else "text/html"
+        )
+        self.send_response(200)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(directory=FETCHER_CASSETTE_DIR, host="127.0.0.1", port=8765):
+    entries = {}
+    for entry in load_cassette(directory):
+        parts = urlsplit(entry["source_url"])
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        entries[path] = entry
+    StandInHandler.entries = entries
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    print(f"대역 서버 실행: http://{host}:{port} (기록 {len(entries)}건)")
+    print("CRAWL_URLS의 호스트를 이 주소로 바꾸면 기록된 응답으로 크롤링합니다.")
+    server.serve_forever()
+
+
+def record(urls, backend=FETCHER_BACKEND, directory=FETCHER_CASSETTE_DIR):
+    crawler = ExhibitionRuleCrawler()
+    fetcher = RecordingFetcher(make_fetcher(crawler, backend, record=False), directory)
+    for url in urls:
+        fetched = fetcher.fetch(url)
+        print(f"{url}: {fetched['status']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="페이지 응답 기록/재생 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser("record", help="CRAWL_URLS 응답을 기록")
+    record_parser.add_argument("--backend", default=FETCHER_BACKEND)
+    record_parser.add_argument("--dir", default=FETCHER_CASSETTE_DIR)
+    serve_parser = subparsers.add_parser("serve", help="기록된 응답으로 대역 서버 실행")
+    serve_parser.add_argument("--dir", default=FETCHER_CASSETTE_DIR)
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(CRAWL_URLS, args.backend, args.dir)
+    else:
+        serve(args.dir, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
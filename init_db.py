@@ -1,5 +1,5 @@
-from models import init_database, get_session
-from sqlalchemy import text
+from models import init_database
+from sqlalchemy import inspect
 
 
 def setup_database():
@@ -7,19 +7,11 @@ def setup_database():
         engine = init_database()
         print("데이터베이스 테이블이 성공적으로 생성되었습니다.")
 
-        session = get_session()
-        result = session.execute(
-            text(
-                "SELECT table_name FROM information_schema.tables WHERE table_schema = 'public'"
-            )
-        )
-        tables = result.fetchall()
+        tables = inspect(engine).get_table_names()
 
         print("생성된 테이블:")
         for table in tables:
-            print(f"  - {table[0]}")
-
-        session.close()
+            print(f"  - {table}")
 
     except Exception as e:
         print(f"데이터베이스 설정 중 오류 발생: {str(e)}")
@@ -1,12 +1,44 @@
-from fastapi import FastAPI, Request, BackgroundTasks
-from fastapi.responses import HTMLResponse, FileResponse
+import startup
+from fastapi import FastAPI, Request, Depends, HTTPException, Query
+from fastapi.responses import HTMLResponse, StreamingResponse, Response
+from starlette.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from models import ExhibitionRule, RuleCategory, RuleItem, get_session
-from crawler import ExhibitionRuleCrawler
-from report_generator import PDFGenerator, PPTGenerator
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import (
+    get_session,
+    get_async_db,
+    get_pool_stats,
+    dispose_async_engine,
+    load_rule_trees,
+    rule_tree_to_dict,
+)
+import repository
+import metrics
+import search
+import export
+from dedup import collapsed_ids
+from report_cache import ReportCache
+from page_cache import page_cache, rule_tag, INDEX_TAG
+from init_db import setup_database
+from config import (
+    CRAWL_URLS,
+    REPORT_MAX_CONCURRENCY,
+    REPORT_STREAM_CHUNK_SIZE,
+    REPORT_SHARD_WORKERS,
+    SCHEDULER_ENABLED,
+    STARTUP_WARMUP,
+)
+from concurrent.futures import ThreadPoolExecutor
+import aiofiles
+import hashlib
+import json
 import os
-from datetime import datetime
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
 
 app = FastAPI(title="Exhibition Rules Management System")
 
@@ -16,149 +48,595 @@ except:
     pass
 
 templates = Jinja2Templates(directory="templates")
+report_cache = ReportCache()
+report_executor = ThreadPoolExecutor(
+    max_workers=REPORT_MAX_CONCURRENCY, thread_name_prefix="report"
+)
 
+# 보고서 생성기(ReportLab, python-pptx)와 크롤러(requests, BeautifulSoup)는 import 비용이 커서
+# 처음 쓸 때 불러옵니다. 읽기 전용 웹 프로세스는 이 모듈들을 전혀 import하지 않습니다.
+LAZY_MODULES = (
+    "report_generator",
+    "report_shards",
+    "crawl_jobs",
+    "crawler",
+    "scheduler",
+    "reportlab",
+    "pptx",
+    "pypdf",
+    "bs4",
+)
+_lazy = {}
+_lazy_lock = threading.RLock()
 
-@app.get("/", response_class=HTMLResponse)
-async def read_root(request: Request):
-    db = get_session()
+
+def lazy(name, factory):
+    value = _lazy.get(name)
+    if value is None:
+        with _lazy_lock:
+            value = _lazy.get(name)
+            if value is None:
+                value = _lazy[name] = factory()
+    return value
+
+
+def get_crawl_jobs():
+    from crawl_jobs import CrawlJobManager
+
+    return lazy("crawl_jobs", CrawlJobManager)
+
+
+def get_crawl_scheduler():
+    from scheduler import CrawlScheduler
+
+    return lazy("crawl_scheduler", lambda: CrawlScheduler(manager=get_crawl_jobs()))
+
+
+def get_sharded_reports():
+    if REPORT_SHARD_WORKERS <= 0:
+        return None
+    from report_shards import ShardedReportBuilder
+
+    return lazy(
+        "sharded_reports",
+        lambda: ShardedReportBuilder(report_cache, REPORT_SHARD_WORKERS),
+    )
+
+
+def warm_up_reports():
+    import report_generator
+
+    get_sharded_reports()
+
+
+WARMUP_TASKS = {"reports": warm_up_reports, "crawler": get_crawl_jobs}
+
+
+POOL_METRICS = [
+    (
+        "db_pool_checked_out",
+        "gauge",
+        "Connections currently checked out",
+        "checked_out",
+    ),
+    ("db_pool_checkouts_total", "counter", "Connection checkouts", "checkouts"),
+    ("db_pool_timeouts_total", "counter", "Checkouts that timed out", "timeouts"),
+]
+
+
+def pool_metrics():
+    stats = get_pool_stats()
+    for name, kind, documentation, key in POOL_METRICS:
+        yield name, documentation, kind, [
+            ({"engine": engine}, snapshot[key]) for engine, snapshot in stats.items()
+        ]
+    yield "db_pool_wait_seconds_total", "Time spent waiting for a connection", "counter", [
+        ({"engine": engine}, snapshot["wait_total_ms"] / 1000)
+        for engine, snapshot in stats.items()
+    ]
+
+
+metrics.register_collector(pool_metrics)
+metrics.register_collector(startup.collect)
+
+
+def observe_request(request, context, started, status):
+    seconds = time.perf_counter() - started
+    queries = context["queries"]
+    # 경로 파라미터가 라벨 수를 늘리지 않도록 라우트 템플릿으로 집계합니다.
+    route = request.scope.get("route")
+    labels = {
+        "method": request.method,
+        "route": route.path if route else "unmatched",
+    }
+    metrics.HTTP_SECONDS.observe(seconds, status=status, **labels)
+    metrics.HTTP_QUERIES.observe(queries, **labels)
+    token = metrics.resume_request(context)
     try:
-        rules = db.query(ExhibitionRule).all()
-        return templates.TemplateResponse(
-            "index.html",
-            {"request": request, "rules": rules, "total_rules": len(rules)},
+        metrics.emit_trace(
+            "http", seconds, dict(labels, status=status, queries=queries)
         )
     finally:
-        db.close()
+        metrics.finish_request(token)
 
 
-@app.get("/rule/{rule_id}", response_class=HTMLResponse)
-async def get_rule_detail(request: Request, rule_id: int):
-    db = get_session()
+async def observed_body(body, request, context, started, status):
     try:
-        rule = db.query(ExhibitionRule).filter(ExhibitionRule.id == rule_id).first()
-        if rule:
-            categories = (
-                db.query(RuleCategory)
-                .filter(RuleCategory.exhibition_rule_id == rule_id)
-                .all()
-            )
-            for category in categories:
-                category.items = (
-                    db.query(RuleItem)
-                    .filter(RuleItem.category_id == category.id)
-                    .order_by(RuleItem.order_index)
-                    .all()
-                )
+        async for chunk in body:
+            yield chunk
+    finally:
+        observe_request(request, context, started, status)
 
-        return templates.TemplateResponse(
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex[:12]
+    token = metrics.start_request(request_id)
+    context = metrics.current_request()
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except BaseException:
+        observe_request(request, context, started, 500)
+        raise
+    finally:
+        metrics.finish_request(token)
+    response.headers["X-Request-ID"] = request_id
+    # /api/export처럼 본문을 만드는 동안 SQL을 실행하는 스트리밍 응답도 있으므로
+    # 본문을 다 보낸 뒤에 소요 시간과 SQL 수를 기록합니다.
+    response.body_iterator = observed_body(
+        response.body_iterator, request, context, started, response.status_code
+    )
+    return response
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    # charset은 starlette가 붙입니다.
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/startup/profile")
+async def startup_profile(limit: int = 20):
+    return startup.profile(max(1, min(limit, API_MAX_LIMIT)), LAZY_MODULES)
+
+
+@app.on_event("startup")
+def on_startup():
+    with startup.phase("setup_database"):
+        setup_database()
+    if SCHEDULER_ENABLED:
+        with startup.phase("scheduler"):
+            get_crawl_scheduler().start()
+    tasks = []
+    for name in STARTUP_WARMUP:
+        if name in WARMUP_TASKS:
+            tasks.append((name, WARMUP_TASKS[name]))
+        else:
+            print(f"알 수 없는 STARTUP_WARMUP 항목: {name}")
+    startup.warm_up(tasks)
+    startup.mark_ready()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    if "crawl_scheduler" in _lazy:
+        _lazy["crawl_scheduler"].stop()
+    if "sharded_reports" in _lazy:
+        _lazy["sharded_reports"].shutdown()
+    await dispose_async_engine()
+
+
+async def cached_page(request, key, tags, load_version, render):
+    entry = page_cache.get(key)
+    if entry is None or not page_cache.is_fresh(entry):
+        version = await load_version()
+        if entry is None or not page_cache.revalidated(entry, version):
+            entry = page_cache.put(key, await render(), version, tags)
+
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(content=entry.body, headers=headers)
+
+
+def render_template(name, context):
+    return templates.get_template(name).render(context).encode("utf-8")
+
+
+@app.get("/", response_class=HTMLResponse)
+async def read_root(request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def render():
+        rules = await repository.list_rules(db)
+        return render_template(
+            "index.html",
+            {"request": request, "rules": rules, "total_rules": len(rules)},
+        )
+
+    return await cached_page(
+        request,
+        ("index",),
+        [INDEX_TAG],
+        lambda: repository.get_data_version(db),
+        render,
+    )
+
+
+@app.get("/rule/{rule_id}", response_class=HTMLResponse)
+async def get_rule_detail(
+    request: Request,
+    rule_id: int,
+    collapse: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def render():
+        rule = await repository.get_rule_tree(db, rule_id)
+        return render_template(
             "rule_detail.html",
             {
                 "request": request,
                 "rule": rule,
-                "categories": categories if rule else [],
+                "categories": rule.categories if rule else [],
+                # 같은 문서 안에서 반복되는 중복 항목은 대표 항목만 보여 줍니다.
+                "collapsed": collapsed_ids([rule]) if rule and collapse else set(),
             },
         )
-    finally:
-        db.close()
 
+    return await cached_page(
+        request,
+        ("rule", rule_id, collapse),
+        [rule_tag(rule_id)],
+        lambda: repository.get_rule_version(db, rule_id),
+        render,
+    )
 
-@app.post("/crawl")
-async def start_crawling(background_tasks: BackgroundTasks):
-    background_tasks.add_task(crawl_data)
-    return {"message": "크롤링이 시작되었습니다. 잠시 후 새로고침해주세요."}
 
+API_MAX_LIMIT = 200
 
-def crawl_data():
-    urls = [
-        "https://gsma.my.site.com/mwcoem/s/New%20for%202026",
-        "https://gsma.my.site.com/mwcoem/s/Event%20Rules%20and%20Regulations",
-        "https://gsma.my.site.com/mwcoem/s/Stand%20Build%20Rules%20and%20Regulations",
-    ]
 
-    crawler = ExhibitionRuleCrawler()
-    crawler.crawl_and_save(urls)
+def serialize_rule(rule, fields):
+    # 값이 없는 키는 빼고, 요청한 깊이까지만 직렬화합니다.
+    if fields == "summary":
+        data = dict(rule)
+    else:
+        data = {
+            "id": rule.id,
+            "title": rule.title,
+            "url": rule.url,
+            "updated_at": rule.updated_at,
+            "categories": [
+                serialize_category(category, fields) for category in rule.categories
+            ],
+        }
+    if data.get("updated_at") is not None:
+        data["updated_at"] = data["updated_at"].isoformat()
+    return {key: value for key, value in data.items() if value is not None}
 
 
-@app.get("/download/pdf")
-async def download_pdf():
-    db = get_session()
-    try:
-        rules = db.query(ExhibitionRule).all()
-        all_data = []
-
-        for rule in rules:
-            categories = (
-                db.query(RuleCategory)
-                .filter(RuleCategory.exhibition_rule_id == rule.id)
-                .all()
-            )
-            rule_data = {"title": rule.title, "url": rule.url, "categories": []}
-
-            for category in categories:
-                items = (
-                    db.query(RuleItem)
-                    .filter(RuleItem.category_id == category.id)
-                    .order_by(RuleItem.order_index)
-                    .all()
+def serialize_category(category, fields):
+    data = {"id": category.id, "name": category.name}
+    if category.name_en and category.name_en != category.name:
+        data["name_en"] = category.name_en
+    if fields == "items":
+        data["items"] = [
+            {
+                key: value
+                for key, value in (
+                    ("id", item.id),
+                    ("ko", item.content_ko),
+                    (
+                        "en",
+                        item.content_en if item.content_en != item.content_ko else None,
+                    ),
+                    ("canonical", item.canonical_item_id),
                 )
-                category_data = {
-                    "name": category.name,
-                    "items": [item.content_ko or item.content_en for item in items],
-                }
-                rule_data["categories"].append(category_data)
-
-            all_data.append(rule_data)
-
-        pdf_generator = PDFGenerator()
-        filename = pdf_generator.generate_pdf(all_data)
-        return FileResponse(
-            path=filename,
-            filename=f"exhibition_rules_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-            media_type="application/pdf",
+                if value is not None
+            }
+            for item in category.rule_items
+        ]
+    return data
+
+
+def compact_json(payload, etag):
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
+
+
+def etag_matches(request, etag):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+
+
+def make_etag(version, *parts):
+    digest = hashlib.sha256(
+        "|".join([version, *map(str, parts)]).encode("utf-8")
+    ).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def check_fields(fields):
+    if fields not in repository.RULE_FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"fields must be one of {', '.join(repository.RULE_FIELDS)}",
         )
-    finally:
-        db.close()
 
 
-@app.get("/download/ppt")
-async def download_ppt():
-    db = get_session()
+@app.get("/api/rules")
+async def api_list_rules(
+    request: Request,
+    fields: str = "summary",
+    after: Optional[int] = None,
+    limit: int = 50,
+    db: AsyncSession = Depends(get_async_db),
+):
+    check_fields(fields)
+    limit = max(1, min(limit, API_MAX_LIMIT))
+    etag = make_etag(
+        await repository.get_data_version(db), "list", fields, after, limit
+    )
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    rules, next_after = await repository.list_rule_page(db, fields, after, limit)
+    payload = {"data": [serialize_rule(rule, fields) for rule in rules]}
+    if next_after is not None:
+        payload["next_after"] = next_after
+    return compact_json(payload, etag)
+
+
+@app.get("/api/rules/{rule_id}")
+async def api_get_rule(
+    request: Request,
+    rule_id: int,
+    fields: str = "items",
+    db: AsyncSession = Depends(get_async_db),
+):
+    check_fields(fields)
+    etag = make_etag(await repository.get_data_version(db), "rule", rule_id, fields)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    rule = await repository.get_rule(db, rule_id, fields)
+    if rule is None:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    return compact_json(serialize_rule(rule, fields), etag)
+
+
+@app.get("/api/search")
+async def search_rules(
+    q: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
     try:
-        rules = db.query(ExhibitionRule).all()
-        all_data = []
-
-        for rule in rules:
-            categories = (
-                db.query(RuleCategory)
-                .filter(RuleCategory.exhibition_rule_id == rule.id)
-                .all()
-            )
-            rule_data = {"title": rule.title, "url": rule.url, "categories": []}
-
-            for category in categories:
-                items = (
-                    db.query(RuleItem)
-                    .filter(RuleItem.category_id == category.id)
-                    .order_by(RuleItem.order_index)
-                    .all()
-                )
-                category_data = {
-                    "name": category.name,
-                    "items": [item.content_ko or item.content_en for item in items],
-                }
-                rule_data["categories"].append(category_data)
-
-            all_data.append(rule_data)
-
-        ppt_generator = PPTGenerator()
-        filename = ppt_generator.generate_ppt(all_data)
-        return FileResponse(
-            path=filename,
-            filename=f"exhibition_rules_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pptx",
-            media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+        return await search.search_items(db, q, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def serialize_snapshot(snapshot):
+    return {
+        "id": snapshot.id,
+        "title": snapshot.title,
+        "item_count": snapshot.item_count,
+        "created_at": snapshot.created_at.isoformat(),
+    }
+
+
+async def rule_url(db, rule_id):
+    rule = await repository.get_rule(db, rule_id, "summary")
+    if rule is None:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    return rule["url"]
+
+
+@app.get("/api/rules/{rule_id}/snapshots")
+async def list_rule_snapshots(
+    rule_id: int, limit: int = 50, db: AsyncSession = Depends(get_async_db)
+):
+    snapshots = await repository.list_snapshots(
+        db, await rule_url(db, rule_id), limit=max(1, min(limit, API_MAX_LIMIT))
+    )
+    return {"data": [serialize_snapshot(snapshot) for snapshot in snapshots]}
+
+
+@app.get("/api/rules/{rule_id}/changes")
+async def rule_changes(
+    rule_id: int,
+    since: Optional[datetime] = None,
+    days: int = 7,
+    db: AsyncSession = Depends(get_async_db),
+):
+    # since(또는 days일 전) 시점의 스냅샷과 최신 스냅샷을 비교합니다.
+    url = await rule_url(db, rule_id)
+    # DB는 UTC naive datetime을 저장하므로 ?since=...+09:00 같은 값은 UTC로 맞춥니다.
+    since = export.naive_utc(since) or datetime.utcnow() - timedelta(days=days)
+    latest = await repository.list_snapshots(db, url, limit=1)
+    if not latest:
+        raise HTTPException(status_code=404, detail="No snapshots for this rule")
+    base = await repository.snapshot_at(db, url, since)
+    diff = await repository.diff_snapshots(db, base, latest[0])
+    diff["base"] = serialize_snapshot(base) if base else None
+    diff["target"] = serialize_snapshot(latest[0])
+    return diff
+
+
+@app.get("/api/snapshots/diff")
+async def snapshot_diff(
+    base: int, target: int, db: AsyncSession = Depends(get_async_db)
+):
+    snapshots = [
+        await repository.get_snapshot(db, snapshot_id) for snapshot_id in (base, target)
+    ]
+    if None in snapshots:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    diff = await repository.diff_snapshots(db, *snapshots)
+    diff["base"], diff["target"] = map(serialize_snapshot, snapshots)
+    return diff
+
+
+@app.get("/api/export")
+def export_rules(
+    fmt: str = Query("ndjson", alias="format"),
+    gzip: bool = False,
+    updated_since: Optional[datetime] = None,
+):
+    # 규칙 → 카테고리 → 항목 행을 서버 측 커서로 읽으면서 바로 내려보냅니다.
+    # 동기 제너레이터라 StreamingResponse가 스레드 풀에서 순회합니다.
+    if fmt not in export.EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"format must be one of {', '.join(export.EXPORT_FORMATS)}",
         )
+    # 응답 헤더의 시작 시각을 다음 증분 추출의 updated_since로 쓰면 됩니다.
+    watermark = datetime.utcnow().isoformat()
+    filename = export.export_filename(fmt, gzip)
+    return StreamingResponse(
+        export.export_chunks(fmt, updated_since, gzip),
+        media_type="application/gzip" if gzip else export.MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Export-Watermark": watermark,
+        },
+    )
+
+
+@app.get("/db/pool")
+async def db_pool_stats():
+    return get_pool_stats()
+
+
+@app.post("/crawl")
+async def start_crawling():
+    job, created = get_crawl_jobs().submit(CRAWL_URLS)
+    if created:
+        message = "크롤링이 시작되었습니다. 잠시 후 새로고침해주세요."
+    else:
+        message = "이미 진행 중인 크롤링이 있습니다. 잠시 후 새로고침해주세요."
+    return {"message": message, "job_id": job.id, "status": job.status}
+
+
+@app.get("/crawl/{job_id}")
+async def get_crawl_job(job_id: str):
+    job = get_crawl_jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Crawl job not found")
+    return job.to_dict()
+
+
+@app.post("/crawl/{job_id}/cancel")
+async def cancel_crawl_job(job_id: str):
+    job = get_crawl_jobs().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Crawl job not found")
+    return job.to_dict()
+
+
+def build_report_data(db, collapse=False):
+    rules = load_rule_trees(db)
+    # collapse면 보고서 전체에서 대표 항목이 이미 실린 중복 항목을 뺍니다.
+    collapsed = collapsed_ids(rules) if collapse else frozenset()
+    return [rule_tree_to_dict(rule, collapsed) for rule in rules]
+
+
+def generate_pdf(data, path):
+    from report_generator import PDFGenerator
+
+    sharded_reports = get_sharded_reports()
+    with metrics.traced(metrics.REPORT_SECONDS, "report", format="pdf"):
+        if sharded_reports is not None:
+            result = sharded_reports.generate_pdf(data, path)
+        else:
+            result = PDFGenerator().generate_pdf(data, path)
+    metrics.REPORT_BYTES.observe(os.path.getsize(path), format="pdf")
+    return result
+
+
+def generate_ppt(data, path):
+    from report_generator import PPTGenerator
+
+    sharded_reports = get_sharded_reports()
+    with metrics.traced(metrics.REPORT_SECONDS, "report", format="pptx"):
+        if sharded_reports is not None:
+            result = sharded_reports.generate_ppt(data, path)
+        else:
+            result = PPTGenerator().generate_ppt(data, path)
+    metrics.REPORT_BYTES.observe(os.path.getsize(path), format="pptx")
+    return result
+
+
+def cached_report(version, extension, generate, collapse=False):
+    # 캐시 미스일 때만 동기 세션으로 데이터를 읽고, 문서 생성은 제한된 워커 풀에서 실행합니다.
+    def build(path):
+        db = get_session()
+        try:
+            data = build_report_data(db, collapse)
+        finally:
+            db.close()
+        return report_executor.submit(generate, data, path).result()
+
+    if collapse:
+        version = f"{version}-collapsed"
+    return report_cache.get_or_build(version, extension, build)
+
+
+async def iter_file(handle):
+    try:
+        while True:
+            chunk = await handle.read(REPORT_STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
     finally:
-        db.close()
+        await handle.close()
+
+
+async def stream_report(db, extension, generate, media_type, collapse=False):
+    version = await repository.get_data_version(db)
+    path = await run_in_threadpool(
+        cached_report, version, extension, generate, collapse
+    )
+    # 응답 전에 파일을 열어 두면 캐시 정리와 경합하지 않습니다.
+    handle = await aiofiles.open(path, "rb")
+    download_name = (
+        f"exhibition_rules_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    )
+    return StreamingResponse(
+        iter_file(handle),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{download_name}"'},
+    )
+
+
+@app.get("/download/pdf")
+async def download_pdf(
+    collapse: bool = False, db: AsyncSession = Depends(get_async_db)
+):
+    return await stream_report(db, "pdf", generate_pdf, "application/pdf", collapse)
+
+
+@app.get("/download/ppt")
+async def download_ppt(
+    collapse: bool = False, db: AsyncSession = Depends(get_async_db)
+):
+    return await stream_report(
+        db,
+        "pptx",
+        generate_ppt,
+        "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+        collapse,
+    )
+
+
+startup.mark_imported("main")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,274 @@
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from config import METRICS_TRACE_LOG
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = tuple(2**power * 1024 for power in range(0, 16, 2))
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_registry = []
+_collectors = []
+_trace_hooks = []
+_request_context = contextvars.ContextVar("request_context", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        labels = _format_labels(self.labelnames, key)
+        return [f"{self.name}{labels} {_format_value(value)}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def _render_sample(self, key, value):
+        counts, total = value
+        lines = [
+            f"{self.name}_bucket"
+            f"{_format_labels(self.labelnames, key, [('le', _format_value(bound))])}"
+            f" {count}"
+            for bound, count in zip(self.buckets, counts)
+        ]
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+
+def register_collector(collect):
+    # collect()는 스크랩할 때마다 (이름, 설명, 종류, [(라벨 dict, 값), ...]) 목록을 돌려줍니다.
+    _collectors.append(collect)
+
+
+def render():
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    for collect in _collectors:
+        for name, documentation, kind, samples in collect():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = _format_labels(labels.keys(), labels.values())
+                lines.append(f"{name}{label_text} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def add_trace_hook(hook):
+    # hook(event)는 단계가 끝날 때마다 호출됩니다.
+    # event: {"stage", "seconds", "labels", "error", "request_id"}
+    _trace_hooks.append(hook)
+
+
+def remove_trace_hook(hook):
+    if hook in _trace_hooks:
+        _trace_hooks.remove(hook)
+
+
+def emit_trace(stage, seconds, labels=None, error=None):
+    if not _trace_hooks:
+        return
+    context = _request_context.get()
+    trace_event = {
+        "stage": stage,
+        "seconds": seconds,
+        "labels": labels or {},
+        "error": error,
+        "request_id": context["request_id"] if context else None,
+    }
+    for hook in list(_trace_hooks):
+        try:
+            hook(trace_event)
+        except Exception as e:
+            print(f"Trace hook error: {str(e)}")
+
+
+@contextmanager
+def traced(histogram, stage, **labels):
+    started = time.perf_counter()
+    error = None
+    try:
+        yield labels
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        histogram.observe(seconds, **labels)
+        emit_trace(stage, seconds, labels, error)
+
+
+def start_request(request_id):
+    return _request_context.set({"request_id": request_id, "queries": 0})
+
+
+def resume_request(context):
+    # 다른 컨텍스트(스트리밍 응답 본문 등)에서 같은 요청으로 이어서 기록할 때 씁니다.
+    return _request_context.set(context)
+
+
+def current_request():
+    return _request_context.get()
+
+
+def finish_request(token):
+    _request_context.reset(token)
+
+
+def count_query(*args):
+    context = _request_context.get()
+    if context is not None:
+        context["queries"] += 1
+
+
+def print_trace(trace_event):
+    labels = ",".join(f"{k}={v}" for k, v in trace_event["labels"].items())
+    print(
+        f"[trace] {trace_event['request_id'] or '-'} {trace_event['stage']} "
+        f"{trace_event['seconds'] * 1000:.1f}ms {labels}"
+        + (f" error={trace_event['error']}" if trace_event["error"] else "")
+    )
+
+
+if METRICS_TRACE_LOG:
+    add_trace_hook(print_trace)
+
+
+FETCH_SECONDS = Histogram(
+    "crawler_fetch_seconds", "Page fetch latency including retries", ["status"]
+)
+FETCH_REQUESTS = Counter(
+    "crawler_fetch_requests_total", "HTTP attempts made by the crawler", ["status"]
+)
+FETCH_RETRIES = Counter(
+    "crawler_fetch_retries_total", "Fetch attempts that were retried"
+)
+FETCH_BYTES = Counter("crawler_fetch_bytes_total", "Response bytes downloaded")
+
+PARSE_SECONDS = Histogram(
+    "crawler_parse_seconds", "parse_page duration by parser branch", ["parser"]
+)
+PARSED_CATEGORIES = Counter(
+    "crawler_parsed_categories_total", "Categories extracted", ["parser"]
+)
+PARSED_ITEMS = Counter("crawler_parsed_items_total", "Rule items extracted", ["parser"])
+
+SAVE_SECONDS = Histogram(
+    "crawler_save_seconds", "save_to_database transaction time", ["mode"]
+)
+SAVED_ROWS = Counter(
+    "crawler_saved_rows_total", "Rows written by save_to_database", ["operation"]
+)
+SAVE_FAILURES = Counter("crawler_save_failures_total", "Failed save_to_database calls")
+CRAWL_PEAK_MEMORY = Gauge(
+    "crawler_peak_memory_megabytes", "Process peak RSS observed after the last crawl"
+)
+
+TRANSLATION_LOOKUPS = Counter(
+    "translation_memory_lookups_total", "Translation memory lookups", ["result"]
+)
+TRANSLATION_SECONDS = Histogram(
+    "translation_batch_seconds", "Translator batch latency", ["translator"]
+)
+TRANSLATION_FAILURES = Counter(
+    "translation_batch_failures_total", "Translator batches that failed", ["translator"]
+)
+
+REPORT_SECONDS = Histogram(
+    "report_generation_seconds",
+    "Report generation time",
+    ["format"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+REPORT_BYTES = Histogram(
+    "report_size_bytes", "Generated report size", ["format"], buckets=SIZE_BUCKETS
+)
+REPORT_SECTIONS = Counter(
+    "report_sections_total",
+    "Per-rule report sections in sharded mode",
+    ["format", "result"],
+)
+
+HTTP_SECONDS = Histogram(
+    "http_request_seconds", "HTTP handler latency", ["method", "route", "status"]
+)
+HTTP_QUERIES = Histogram(
+    "http_request_sql_queries",
+    "SQL statements executed per HTTP request",
+    ["method", "route"],
+    buckets=COUNT_BUCKETS,
+)
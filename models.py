@@ -5,18 +5,39 @@ from sqlalchemy import (
     Text,
     DateTime,
     ForeignKey,
+    Index,
     create_engine,
+    event,
+    inspect,
+    text,
+    select,
+    func,
 )
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.orm import relationship, sessionmaker, selectinload
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from datetime import datetime
-from config import DATABASE_URL
+import hashlib
+import threading
+import time
+from search import setup_search_index
+from metrics import count_query
+from config import (
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+)
 
 Base = declarative_base()
 
 
 class ExhibitionRule(Base):
     __tablename__ = "exhibition_rules"
+    __table_args__ = (Index("ux_exhibition_rules_url", "url", unique=True),)
 
     id = Column(Integer, primary_key=True, index=True)
     url = Column(String(500), nullable=False)
@@ -24,43 +45,409 @@ class ExhibitionRule(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    categories = relationship("RuleCategory", back_populates="exhibition_rule")
+    categories = relationship(
+        "RuleCategory",
+        back_populates="exhibition_rule",
+        cascade="all, delete-orphan",
+        order_by="(RuleCategory.order_index, RuleCategory.id)",
+    )
 
 
 class RuleCategory(Base):
     __tablename__ = "rule_categories"
 
     id = Column(Integer, primary_key=True, index=True)
-    exhibition_rule_id = Column(Integer, ForeignKey("exhibition_rules.id"))
+    exhibition_rule_id = Column(Integer, ForeignKey("exhibition_rules.id"), index=True)
     name = Column(String(200), nullable=False)
     name_en = Column(String(200))
     description = Column(Text)
+    order_index = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     exhibition_rule = relationship("ExhibitionRule", back_populates="categories")
-    rule_items = relationship("RuleItem", back_populates="category")
+    rule_items = relationship(
+        "RuleItem",
+        back_populates="category",
+        cascade="all, delete-orphan",
+        order_by="RuleItem.order_index",
+    )
 
 
 class RuleItem(Base):
     __tablename__ = "rule_items"
+    __table_args__ = (
+        Index("ix_rule_items_category_order", "category_id", "order_index"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     category_id = Column(Integer, ForeignKey("rule_categories.id"))
     content_ko = Column(Text)
     content_en = Column(Text)
+    content_hash = Column(String(64), index=True)
+    # 거의 같은 항목 묶음의 대표 항목 id입니다(대표 항목 자신은 NULL).
+    # 크롤러가 항목을 일괄 삭제하므로 외래 키 대신 인덱스만 둡니다.
+    canonical_item_id = Column(Integer, index=True)
     order_index = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     category = relationship("RuleCategory", back_populates="rule_items")
 
 
+class PageFetchState(Base):
+    __tablename__ = "page_fetch_states"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String(500), nullable=False, unique=True, index=True)
+    etag = Column(String(200))
+    last_modified = Column(String(100))
+    content_hash = Column(String(64))
+    checked_at = Column(DateTime)
+    changed_at = Column(DateTime)
+    check_count = Column(Integer, default=0)
+    change_count = Column(Integer, default=0)
+    crawl_interval = Column(Integer)
+    next_crawl_at = Column(DateTime, index=True)
+
+
+class TranslationMemory(Base):
+    # 원문 해시와 대상 언어로 번역 결과를 재사용합니다.
+    __tablename__ = "translation_memory"
+    __table_args__ = (
+        Index(
+            "ux_translation_memory_source", "source_hash", "target_lang", unique=True
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    source_hash = Column(String(64), nullable=False)
+    target_lang = Column(String(10), nullable=False)
+    source_text = Column(Text, nullable=False)
+    translated_text = Column(Text, nullable=False)
+    translator = Column(String(50))
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ItemLshBucket(Base):
+    # 항목 본문 해시별 MinHash LSH 밴드 버킷입니다. 같은 버킷을 공유하는 본문만 유사도 비교 후보가 됩니다.
+    __tablename__ = "item_lsh_buckets"
+
+    id = Column(Integer, primary_key=True)
+    content_hash = Column(String(64), nullable=False, index=True)
+    bucket = Column(String(24), nullable=False, index=True)
+
+
+class ItemContent(Base):
+    # 항목 본문은 해시를 키로 한 번만 저장하고 모든 스냅샷이 참조합니다.
+    __tablename__ = "item_contents"
+
+    hash = Column(String(64), primary_key=True)
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class SnapshotManifest(Base):
+    # 규칙 트리 구조(카테고리 이름과 항목 해시 목록)를 JSON으로 저장합니다.
+    __tablename__ = "snapshot_manifests"
+
+    hash = Column(String(64), primary_key=True)
+    body = Column(Text, nullable=False)
+    item_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class RuleSnapshot(Base):
+    __tablename__ = "rule_snapshots"
+    __table_args__ = (Index("ix_rule_snapshots_url_created", "url", "created_at"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String(500), nullable=False)
+    exhibition_rule_id = Column(Integer, index=True)
+    title = Column(String(200), nullable=False)
+    manifest_hash = Column(String(64), ForeignKey("snapshot_manifests.hash"))
+    item_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def on_connect(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def on_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def on_checkin(self):
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def on_wait(self, seconds, timed_out=False):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "connections_opened": self.connections_opened,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "wait_count": self.wait_count,
+                "wait_total_ms": round(self.wait_total * 1000, 3),
+                "wait_avg_ms": (
+                    round(self.wait_total * 1000 / self.wait_count, 3)
+                    if self.wait_count
+                    else 0.0
+                ),
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "timeouts": self.timeouts,
+            }
+
+
+pool_stats = PoolStats()
+async_pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    stats = pool_stats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            self.stats.on_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.on_wait(time.perf_counter() - start)
+        return conn
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    stats = async_pool_stats
+
+
+_engine = None
+_SessionLocal = None
+_async_engine = None
+_AsyncSessionLocal = None
+_schema_ready = False
+_engine_lock = threading.Lock()
+
+
+def _engine_options(url, poolclass=InstrumentedQueuePool):
+    if url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def get_engine():
+    global _engine, _SessionLocal
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+                _listen_pool_events(engine, pool_stats)
+                _SessionLocal = sessionmaker(
+                    autocommit=False, autoflush=False, bind=engine
+                )
+                _engine = engine
+    return _engine
+
+
+def _listen_pool_events(engine, stats):
+    event.listen(engine, "connect", lambda *args: stats.on_connect())
+    event.listen(engine, "checkout", lambda *args: stats.on_checkout())
+    event.listen(engine, "checkin", lambda *args: stats.on_checkin())
+    # 요청별 SQL 실행 횟수를 /metrics에 집계합니다.
+    event.listen(engine, "before_cursor_execute", count_query)
+
+
+def async_database_url(url):
+    if url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + url[len("postgresql://") :]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://") :]
+    return url
+
+
+def get_async_engine():
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        with _engine_lock:
+            if _async_engine is None:
+                url = async_database_url(DATABASE_URL)
+                engine = create_async_engine(
+                    url, **_engine_options(url, InstrumentedAsyncQueuePool)
+                )
+                _listen_pool_events(engine.sync_engine, async_pool_stats)
+                _AsyncSessionLocal = async_sessionmaker(
+                    engine, autoflush=False, expire_on_commit=False
+                )
+                _async_engine = engine
+    return _async_engine
+
+
+def get_pool_stats():
+    stats = {"sync": pool_stats.snapshot(), "async": async_pool_stats.snapshot()}
+    stats["sync"]["pool"] = get_engine().pool.status()
+    if _async_engine is not None:
+        stats["async"]["pool"] = _async_engine.pool.status()
+    return stats
+
+
+def _add_missing_columns(engine):
+    # create_all은 기존 테이블에 새 컬럼을 추가하지 않으므로 nullable 컬럼만 보충합니다.
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            added = set()
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                    )
+                )
+                added.add(column.name)
+            for index in table.indexes:
+                if added & {column.name for column in index.columns}:
+                    index.create(conn, checkfirst=True)
+
+
+def _add_missing_indexes(engine):
+    # 기존 DB에 새로 정의한 인덱스를 만듭니다. 중복 URL이 남아 있으면
+    # 유니크 인덱스 생성이 실패하므로 인덱스마다 별도 트랜잭션으로 처리합니다.
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            try:
+                with engine.begin() as conn:
+                    index.create(conn)
+            except Exception as e:
+                print(f"인덱스 {index.name} 생성 실패: {str(e)}")
+
+
 def init_database():
-    engine = create_engine(DATABASE_URL)
-    Base.metadata.create_all(bind=engine)
+    global _schema_ready
+    engine = get_engine()
+    if not _schema_ready:
+        with _engine_lock:
+            if not _schema_ready:
+                Base.metadata.create_all(bind=engine)
+                _add_missing_columns(engine)
+                _add_missing_indexes(engine)
+                setup_search_index(engine)
+                _schema_ready = True
     return engine
 
 
 def get_session():
-    engine = init_database()
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    return SessionLocal()
+    get_engine()
+    return _SessionLocal()
+
+
+def rule_tree_statement(rule_id=None, with_items=True):
+    # 규칙 → 카테고리 → 항목을 레벨당 한 번의 쿼리로 읽어옵니다.
+    loader = selectinload(ExhibitionRule.categories)
+    if with_items:
+        loader = loader.selectinload(RuleCategory.rule_items)
+    statement = select(ExhibitionRule).options(loader).order_by(ExhibitionRule.id)
+    if rule_id is not None:
+        statement = statement.where(ExhibitionRule.id == rule_id)
+    return statement
+
+
+def load_rule_trees(db, rule_id=None, with_items=True):
+    return db.scalars(rule_tree_statement(rule_id, with_items)).all()
+
+
+def data_version_statement():
+    # 규칙 트리가 바뀌면 달라지는 값(개수, 최신 updated_at)으로 버전을 만듭니다.
+    return select(
+        select(func.count(ExhibitionRule.id)).scalar_subquery(),
+        select(func.max(ExhibitionRule.updated_at)).scalar_subquery(),
+        select(func.count(RuleCategory.id)).scalar_subquery(),
+        select(func.max(RuleCategory.updated_at)).scalar_subquery(),
+        select(func.count(RuleItem.id)).scalar_subquery(),
+        select(func.max(RuleItem.updated_at)).scalar_subquery(),
+    )
+
+
+def version_from_row(row):
+    return hashlib.sha256(repr(tuple(row)).encode("utf-8")).hexdigest()[:16]
+
+
+def data_version(db):
+    return version_from_row(db.execute(data_version_statement()).one())
+
+
+def rule_tree_to_dict(rule, collapsed=frozenset()):
+    # collapsed에 든 항목(대표 항목이 같은 문서에 있는 중복 항목)은 빼고 만듭니다.
+    return {
+        "title": rule.title,
+        "url": rule.url,
+        "categories": [
+            {
+                "name": category.name,
+                "items": [
+                    item.content_ko or item.content_en
+                    for item in category.rule_items
+                    if item.id not in collapsed
+                ],
+            }
+            for category in rule.categories
+        ],
+    }
+
+
+async def get_async_db():
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _AsyncSessionLocal = None
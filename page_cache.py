@@ -0,0 +1,90 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from config import PAGE_CACHE_MAX_ENTRIES, PAGE_CACHE_MAX_BYTES, PAGE_CACHE_TTL
+
+INDEX_TAG = "index"
+
+
+def rule_tag(rule_id):
+    return f"rule:{rule_id}"
+
+
+class CachedPage:
+    __slots__ = ("body", "etag", "version", "tags", "checked_at")
+
+    def __init__(self, body, version, tags):
+        self.body = body
+        self.etag = f'W/"{hashlib.sha256(body).hexdigest()[:20]}"'
+        self.version = version
+        self.tags = frozenset(tags)
+        self.checked_at = time.monotonic()
+
+
+class PageCache:
+    def __init__(
+        self,
+        max_entries=PAGE_CACHE_MAX_ENTRIES,
+        max_bytes=PAGE_CACHE_MAX_BYTES,
+        ttl=PAGE_CACHE_TTL,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry):
+        # TTL 안에서는 DB 버전 확인 없이 바로 응답합니다.
+        # 같은 프로세스의 저장은 invalidate_rules로 즉시 반영되고,
+        # 다른 프로세스(스케줄러 워커 등)의 저장은 TTL 안에 반영됩니다.
+        return time.monotonic() - entry.checked_at < self.ttl
+
+    def revalidated(self, entry, version):
+        if entry.version != version:
+            return False
+        entry.checked_at = time.monotonic()
+        return True
+
+    def put(self, key, body, version, tags):
+        entry = CachedPage(body, version, tags)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+        return entry
+
+    def invalidate(self, tags):
+        tags = set(tags)
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry.tags & tags]
+            for key in stale:
+                self._bytes -= len(self._entries.pop(key).body)
+        return len(stale)
+
+    def invalidate_rules(self, rule_ids):
+        return self.invalidate([INDEX_TAG, *map(rule_tag, rule_ids)])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+page_cache = PageCache()
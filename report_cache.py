@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from config import REPORT_CACHE_DIR, REPORT_CACHE_MAX_BYTES, REPORT_CACHE_MAX_AGE
+
+# 다운로드 중인 파일이 바로 지워지지 않도록 최근에 사용한 파일은 정리하지 않습니다.
+EVICTION_GRACE_SECONDS = 60
+
+
+class ReportCache:
+    def __init__(
+        self,
+        directory=REPORT_CACHE_DIR,
+        max_bytes=REPORT_CACHE_MAX_BYTES,
+        max_age=REPORT_CACHE_MAX_AGE,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._inflight = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, version, extension):
+        return os.path.join(self.directory, f"exhibition_rules_{version}.{extension}")
+
+    def get_or_build(self, version, extension, build):
+        path = self.path_for(version, extension)
+        with self._lock:
+            if os.path.exists(path):
+                os.utime(path)
+                return path
+            future = self._inflight.get(path)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[path] = future
+
+        # 같은 버전을 이미 생성 중이면 그 결과를 기다립니다.
+        if not owner:
+            return future.result()
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            build(tmp_path)
+            os.replace(tmp_path, path)
+            future.set_result(path)
+        except BaseException as e:
+            future.set_exception(e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(path, None)
+
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep=None):
+        now = time.time()
+        entries = []
+        with self._lock:
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if path == keep or path in self._inflight:
+                    continue
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            if keep and os.path.exists(keep):
+                total += os.path.getsize(keep)
+
+            removed = 0
+            for mtime, size, path in sorted(entries):
+                age = now - mtime
+                if age < EVICTION_GRACE_SECONDS:
+                    continue
+                if (
+                    path.endswith(".tmp")
+                    or age > self.max_age
+                    or total > self.max_bytes
+                ):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    total -= size
+                    removed += 1
+        return removed
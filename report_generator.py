@@ -13,6 +13,16 @@ from pptx.enum.text import PP_ALIGN
 import os
 from datetime import datetime
 
+PAGE_NUMBER_FONT = "Helvetica"
+PAGE_NUMBER_SIZE = 9
+PAGE_NUMBER_COLOR = Color(0.5, 0.5, 0.5)
+
+
+def page_number_position(page_width, number):
+    # 쪽 번호를 하단 가운데에 놓는 좌표입니다. 분할 생성의 병합 단계도 같은 위치를 씁니다.
+    width = pdfmetrics.stringWidth(number, PAGE_NUMBER_FONT, PAGE_NUMBER_SIZE)
+    return (page_width - width) / 2, 0.5 * inch
+
 
 class PDFGenerator:
     def __init__(self):
@@ -54,11 +64,8 @@ class PDFGenerator:
             )
         )
 
-    def generate_pdf(self, data):
-        filename = f"exhibition_rules_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        doc = SimpleDocTemplate(filename, pagesize=A4)
+    def title_story(self):
         story = []
-
         title = Paragraph("전시회 규칙 및 규정 가이드", self.styles["CustomTitle"])
         story.append(title)
         story.append(Spacer(1, 20))
@@ -69,43 +76,77 @@ class PDFGenerator:
         )
         story.append(subtitle)
         story.append(Spacer(1, 30))
+        return story
 
-        for rule_data in data:
-            rule_title = Paragraph(f"📋 {rule_data['title']}", self.styles["Heading1"])
-            story.append(rule_title)
-            story.append(Spacer(1, 12))
-
-            url_para = Paragraph(
-                f"출처: <link href='{rule_data['url']}'>{rule_data['url']}</link>",
-                self.styles["Normal"],
-            )
-            story.append(url_para)
-            story.append(Spacer(1, 20))
+    def rule_story(self, rule_data):
+        story = []
+        rule_title = Paragraph(f"📋 {rule_data['title']}", self.styles["Heading1"])
+        story.append(rule_title)
+        story.append(Spacer(1, 12))
 
-            for category in rule_data["categories"]:
-                cat_title = Paragraph(
-                    f"🔸 {category['name']}", self.styles["CategoryTitle"]
-                )
-                story.append(cat_title)
-                story.append(Spacer(1, 8))
+        url_para = Paragraph(
+            f"출처: <link href='{rule_data['url']}'>{rule_data['url']}</link>",
+            self.styles["Normal"],
+        )
+        story.append(url_para)
+        story.append(Spacer(1, 20))
 
-                for idx, item in enumerate(category["items"], 1):
-                    if len(item) > 20:
-                        item_para = Paragraph(f"{idx}. {item}", self.styles["RuleItem"])
-                        story.append(item_para)
+        for category in rule_data["categories"]:
+            cat_title = Paragraph(
+                f"🔸 {category['name']}", self.styles["CategoryTitle"]
+            )
+            story.append(cat_title)
+            story.append(Spacer(1, 8))
+
+            for idx, item in enumerate(category["items"], 1):
+                if len(item) > 20:
+                    item_para = Paragraph(f"{idx}. {item}", self.styles["RuleItem"])
+                    story.append(item_para)
+
+            story.append(Spacer(1, 15))
+
+        story.append(PageBreak())
+        return story
+
+    def number_page(self, canvas, doc):
+        number = str(doc.page)
+        x, y = page_number_position(doc.pagesize[0], number)
+        canvas.saveState()
+        canvas.setFont(PAGE_NUMBER_FONT, PAGE_NUMBER_SIZE)
+        canvas.setFillColor(PAGE_NUMBER_COLOR)
+        canvas.drawString(x, y, number)
+        canvas.restoreState()
+
+    def generate_pdf(self, data, filename=None):
+        if filename is None:
+            filename = (
+                f"exhibition_rules_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+            )
+        doc = SimpleDocTemplate(filename, pagesize=A4)
+        story = self.title_story()
+        for rule_data in data:
+            story.extend(self.rule_story(rule_data))
 
-                story.append(Spacer(1, 15))
+        doc.build(story, onFirstPage=self.number_page, onLaterPages=self.number_page)
+        return filename
 
-            story.append(PageBreak())
+    # 분할 생성용 조각들입니다. 쪽 번호 없이 렌더링하고 합칠 때 전체 기준으로 번호를 찍습니다.
+    def generate_title(self, filename):
+        SimpleDocTemplate(filename, pagesize=A4).build(
+            self.title_story() + [PageBreak()]
+        )
+        return filename
 
-        doc.build(story)
+    def generate_section(self, rule_data, filename):
+        SimpleDocTemplate(filename, pagesize=A4).build(self.rule_story(rule_data))
         return filename
 
 
 class PPTGenerator:
-    def __init__(self):
+    def __init__(self, title_slide=True):
         self.prs = Presentation()
-        self.setup_slides()
+        if title_slide:
+            self.setup_slides()
 
     def setup_slides(self):
         title_slide_layout = self.prs.slide_layouts[0]
@@ -116,8 +157,8 @@ class PPTGenerator:
         title.text = "전시회 규칙 및 규정 가이드"
         subtitle.text = f"Exhibition Rules & Regulations\n생성일: {datetime.now().strftime('%Y년 %m월 %d일')}"
 
-    def generate_ppt(self, data):
-        for rule_data in data:
+    def add_rule_slides(self, rule_data, include_title=True):
+        if include_title:
             title_slide = self.prs.slide_layouts[1]
             slide = self.prs.slides.add_slide(title_slide)
             title = slide.shapes.title
@@ -132,26 +173,25 @@ class PPTGenerator:
             p.font.size = Pt(12)
             p.font.color.rgb = RGBColor(128, 128, 128)
 
-            for category in rule_data["categories"]:
-                content_slide = self.prs.slide_layouts[1]
-                slide = self.prs.slides.add_slide(content_slide)
-                title = slide.shapes.title
-                content = slide.placeholders[1]
+        for category in rule_data["categories"]:
+            content_slide = self.prs.slide_layouts[1]
+            slide = self.prs.slides.add_slide(content_slide)
+            title = slide.shapes.title
+            content = slide.placeholders[1]
 
-                title.text = f"🔸 {category['name']}"
+            title.text = f"🔸 {category['name']}"
 
-                tf = content.text_frame
-                tf.clear()
+            tf = content.text_frame
+            tf.clear()
 
-                for idx, item in enumerate(category["items"][:8], 1):
-                    if len(item) > 15:
-                        p = tf.paragraphs[0] if idx == 1 else tf.add_paragraph()
-                        p.text = (
-                            f"{idx}. {item[:150]}{'...' if len(item) > 150 else ''}"
-                        )
-                        p.font.size = Pt(14)
-                        p.space_after = Pt(8)
+            for idx, item in enumerate(category["items"][:8], 1):
+                if len(item) > 15:
+                    p = tf.paragraphs[0] if idx == 1 else tf.add_paragraph()
+                    p.text = f"{idx}. {item[:150]}{'...' if len(item) > 150 else ''}"
+                    p.font.size = Pt(14)
+                    p.space_after = Pt(8)
 
+    def add_summary_slide(self, data):
         summary_slide = self.prs.slide_layouts[1]
         slide = self.prs.slides.add_slide(summary_slide)
         title = slide.shapes.title
@@ -175,6 +215,14 @@ class PPTGenerator:
         p.font.size = Pt(14)
         p.font.color.rgb = RGBColor(128, 128, 128)
 
-        filename = f"exhibition_rules_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pptx"
+    def generate_ppt(self, data, filename=None):
+        for rule_data in data:
+            self.add_rule_slides(rule_data)
+        self.add_summary_slide(data)
+
+        if filename is None:
+            filename = (
+                f"exhibition_rules_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pptx"
+            )
         self.prs.save(filename)
         return filename
@@ -0,0 +1,318 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import posixpath
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from lxml import etree
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import (
+    ArrayObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    NameObject,
+)
+import metrics
+from report_generator import (
+    PDFGenerator,
+    PPTGenerator,
+    PAGE_NUMBER_FONT,
+    PAGE_NUMBER_SIZE,
+    PAGE_NUMBER_COLOR,
+    page_number_position,
+)
+from config import REPORT_SHARD_WORKERS
+
+# 섹션 렌더링 결과가 바뀌는 수정을 하면 올려서 캐시된 섹션을 버립니다.
+SECTION_FORMAT = 1
+# python-pptx의 add_slide는 덱의 슬라이드 수에 비례해 느려지므로 PPT 섹션은 카테고리 단위로 더 나눕니다.
+PPT_SECTION_CATEGORIES = 100
+PAGE_NUMBER_RESOURCE = "/FPageNo"
+
+NS = {
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+    "ct": "http://schemas.openxmlformats.org/package/2006/content-types",
+}
+SLIDE_RELATIONSHIP = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide"
+)
+SLIDE_CONTENT_TYPE = (
+    "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+)
+
+
+def section_version(rule_data):
+    # 규칙 문서 하나의 내용 해시입니다. 바뀐 규칙의 섹션만 다시 렌더링됩니다.
+    payload = json.dumps(
+        [SECTION_FORMAT, rule_data], ensure_ascii=False, sort_keys=True, default=str
+    )
+    return "section_" + hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def section_parts(rule_data, extension):
+    # (캐시 버전, 렌더링할 규칙 데이터, 제목 포함 여부) 목록입니다.
+    version = section_version(rule_data)
+    if extension == "pdf":
+        return [(version, rule_data, True)]
+    categories = rule_data["categories"]
+    parts = []
+    for index, start in enumerate(
+        range(0, len(categories) or 1, PPT_SECTION_CATEGORIES)
+    ):
+        chunk = dict(
+            rule_data, categories=categories[start : start + PPT_SECTION_CATEGORIES]
+        )
+        parts.append((f"{version}_{index}", chunk, index == 0))
+    return parts
+
+
+def render_section(extension, rule_data, path, include_title=True):
+    # 워커 프로세스에서 실행됩니다. 완성된 파일만 캐시 경로에 보이도록 임시 파일로 만든 뒤 옮깁니다.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        if extension == "pdf":
+            PDFGenerator().generate_section(rule_data, tmp_path)
+        else:
+            generator = PPTGenerator(title_slide=False)
+            generator.add_rule_slides(rule_data, include_title)
+            generator.prs.save(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def page_number_stream(page, number):
+    text = str(number)
+    x, y = page_number_position(float(page.mediabox.width), text)
+    red, green, blue = PAGE_NUMBER_COLOR.rgb()
+    stream = DecodedStreamObject()
+    stream.set_data(
+        (
+            f"Q q BT {red:.3f} {green:.3f} {blue:.3f} rg "
+            f"{PAGE_NUMBER_RESOURCE} {PAGE_NUMBER_SIZE} Tf "
+            f"{x:.2f} {y:.2f} Td ({text}) Tj ET Q"
+        ).encode("latin-1")
+    )
+    return stream
+
+
+def stamp_page_numbers(writer, font):
+    # 합친 문서 전체 기준으로 쪽 번호를 찍습니다.
+    # merge_page는 페이지마다 콘텐츠를 다시 파싱하므로, 기존 스트림을 q/Q로 감싸고
+    # 번호를 그리는 작은 스트림만 덧붙입니다.
+    opening = DecodedStreamObject()
+    opening.set_data(b"q")
+    opening = writer._add_object(opening)
+    for number, page in enumerate(writer.pages, 1):
+        resources = page.setdefault(NameObject("/Resources"), DictionaryObject())
+        resources = resources.get_object()
+        fonts = resources.setdefault(NameObject("/Font"), DictionaryObject())
+        fonts.get_object()[NameObject(PAGE_NUMBER_RESOURCE)] = font
+
+        contents = page.get("/Contents")
+        existing = [] if contents is None else contents.get_object()
+        if not isinstance(existing, ArrayObject):
+            existing = [contents]
+        stamp = writer._add_object(page_number_stream(page, number))
+        page[NameObject("/Contents")] = ArrayObject([opening, *existing, stamp])
+
+
+def merge_pdf(title_path, section_paths, titles, path):
+    writer = PdfWriter()
+    writer.append(title_path)
+    for title, section_path in zip(titles, section_paths):
+        start = len(writer.pages)
+        writer.append(PdfReader(section_path), import_outline=False)
+        writer.add_outline_item(title, start)
+
+    font = writer._add_object(
+        DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject("/" + PAGE_NUMBER_FONT),
+                NameObject("/Encoding"): NameObject("/WinAnsiEncoding"),
+            }
+        )
+    )
+    stamp_page_numbers(writer, font)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+def deck_slides(archive):
+    # presentation.xml의 순서대로 (슬라이드 XML, 슬라이드 rels) 목록을 돌려줍니다.
+    presentation = etree.fromstring(archive.read("ppt/presentation.xml"))
+    relationships = etree.fromstring(archive.read("ppt/_rels/presentation.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in relationships}
+    names = set(archive.namelist())
+    slides = []
+    for slide_id in presentation.iterfind("p:sldIdLst/p:sldId", NS):
+        name = posixpath.join("ppt", targets[slide_id.get(f"{{{NS['r']}}}id")])
+        directory, base = posixpath.split(name)
+        rels_name = posixpath.join(directory, "_rels", base + ".rels")
+        slides.append(
+            (
+                archive.read(name),
+                archive.read(rels_name) if rels_name in names else None,
+            )
+        )
+    return slides
+
+
+def merge_pptx(base_path, section_paths, path, insert_at=1):
+    # python-pptx의 add_slide는 슬라이드 수에 비례해 느려지므로 패키지(zip) 단계에서 합칩니다.
+    # 모든 덱이 같은 기본 템플릿으로 만들어져 슬라이드 rels는 같은 레이아웃만 가리킵니다.
+    with zipfile.ZipFile(base_path) as base:
+        slides = deck_slides(base)
+        sections = []
+        for section_path in section_paths:
+            with zipfile.ZipFile(section_path) as section:
+                sections.extend(deck_slides(section))
+        slides[insert_at:insert_at] = sections
+
+        presentation = etree.fromstring(base.read("ppt/presentation.xml"))
+        relationships = etree.fromstring(base.read("ppt/_rels/presentation.xml.rels"))
+        content_types = etree.fromstring(base.read("[Content_Types].xml"))
+        for rel in list(relationships):
+            if rel.get("Type") == SLIDE_RELATIONSHIP:
+                relationships.remove(rel)
+        for override in list(content_types):
+            if override.get("ContentType") == SLIDE_CONTENT_TYPE:
+                content_types.remove(override)
+        slide_list = presentation.find("p:sldIdLst", NS)
+        for slide_id in list(slide_list):
+            slide_list.remove(slide_id)
+
+        slide_parts = []
+        for number, (slide_xml, slide_rels) in enumerate(slides, 1):
+            rel_id = f"rIdSlide{number}"
+            etree.SubElement(
+                relationships,
+                f"{{{NS['rel']}}}Relationship",
+                Id=rel_id,
+                Type=SLIDE_RELATIONSHIP,
+                Target=f"slides/slide{number}.xml",
+            )
+            etree.SubElement(
+                content_types,
+                f"{{{NS['ct']}}}Override",
+                PartName=f"/ppt/slides/slide{number}.xml",
+                ContentType=SLIDE_CONTENT_TYPE,
+            )
+            etree.SubElement(
+                slide_list,
+                f"{{{NS['p']}}}sldId",
+                {"id": str(255 + number), f"{{{NS['r']}}}id": rel_id},
+            )
+            slide_parts.append((f"ppt/slides/slide{number}.xml", slide_xml))
+            if slide_rels is not None:
+                slide_parts.append(
+                    (f"ppt/slides/_rels/slide{number}.xml.rels", slide_rels)
+                )
+
+        replaced = {
+            "ppt/presentation.xml": presentation,
+            "ppt/_rels/presentation.xml.rels": relationships,
+            "[Content_Types].xml": content_types,
+        }
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as out:
+            for info in base.infolist():
+                if info.filename.startswith("ppt/slides/"):
+                    continue
+                if info.filename in replaced:
+                    out.writestr(
+                        info.filename,
+                        etree.tostring(
+                            replaced[info.filename],
+                            xml_declaration=True,
+                            encoding="UTF-8",
+                            standalone=True,
+                        ),
+                    )
+                else:
+                    out.writestr(info, base.read(info.filename))
+            for name, data in slide_parts:
+                out.writestr(name, data)
+    return path
+
+
+class ShardedReportBuilder:
+    # 규칙 문서(ExhibitionRule)별 섹션을 프로세스 풀에서 렌더링한 뒤 하나로 합칩니다.
+    # 섹션은 내용 해시로 보고서 캐시 디렉터리에 남아, 규칙 하나만 바뀌면 그 섹션만 다시 만듭니다.
+    def __init__(self, cache, workers=REPORT_SHARD_WORKERS):
+        self.cache = cache
+        self.workers = max(1, workers)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                # 서버 스레드가 있는 상태에서 fork하지 않도록 spawn으로 워커를 띄웁니다.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def sections(self, data, extension):
+        pending = []
+        for rule_data in data:
+            for version, part, include_title in section_parts(rule_data, extension):
+                path = self.cache.path_for(version, extension)
+                try:
+                    # 재사용하는 섹션은 캐시 정리 대상에서 밀려나도록 사용 시각을 갱신합니다.
+                    os.utime(path)
+                    metrics.REPORT_SECTIONS.inc(format=extension, result="reused")
+                    pending.append(path)
+                except FileNotFoundError:
+                    metrics.REPORT_SECTIONS.inc(format=extension, result="rendered")
+                    pending.append(
+                        self.executor().submit(
+                            render_section, extension, part, path, include_title
+                        )
+                    )
+        return [item if isinstance(item, str) else item.result() for item in pending]
+
+    def generate_pdf(self, data, filename):
+        section_paths = self.sections(data, "pdf")
+        title_path = f"{filename}.title.tmp"
+        try:
+            PDFGenerator().generate_title(title_path)
+            merge_pdf(
+                title_path,
+                section_paths,
+                [rule_data["title"] for rule_data in data],
+                filename,
+            )
+        finally:
+            if os.path.exists(title_path):
+                os.remove(title_path)
+        return filename
+
+    def generate_ppt(self, data, filename):
+        section_paths = self.sections(data, "pptx")
+        base_path = f"{filename}.base.tmp"
+        try:
+            generator = PPTGenerator()
+            generator.add_summary_slide(data)
+            generator.prs.save(base_path)
+            merge_pptx(base_path, section_paths, filename, insert_at=1)
+        finally:
+            if os.path.exists(base_path):
+                os.remove(base_path)
+        return filename
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
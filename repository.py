@@ -0,0 +1,139 @@
+from sqlalchemy import select
+from models import (
+    ExhibitionRule,
+    ItemContent,
+    RuleSnapshot,
+    SnapshotManifest,
+    rule_tree_statement,
+    data_version_statement,
+    version_from_row,
+)
+from snapshots import parse_manifest, diff_manifests, changed_hashes, HASH_BATCH_SIZE
+
+RULE_FIELDS = ("summary", "categories", "items")
+
+
+async def list_rules(db, with_items=False):
+    result = await db.scalars(rule_tree_statement(with_items=with_items))
+    return result.all()
+
+
+async def get_rule_tree(db, rule_id):
+    result = await db.scalars(rule_tree_statement(rule_id=rule_id))
+    return result.first()
+
+
+async def get_data_version(db):
+    result = await db.execute(data_version_statement())
+    return version_from_row(result.one())
+
+
+async def get_rule_version(db, rule_id):
+    # 상세 페이지는 해당 규칙의 updated_at만으로 유효성을 확인합니다.
+    statement = select(ExhibitionRule.updated_at).where(ExhibitionRule.id == rule_id)
+    updated_at = await db.scalar(statement)
+    return updated_at.isoformat() if updated_at else "missing"
+
+
+def _summary_statement():
+    return select(
+        ExhibitionRule.id,
+        ExhibitionRule.title,
+        ExhibitionRule.url,
+        ExhibitionRule.updated_at,
+    ).order_by(ExhibitionRule.id)
+
+
+async def list_rule_page(db, fields="summary", after_id=None, limit=50):
+    # limit + 1건을 읽어 다음 페이지가 있는지 판단합니다.
+    if fields == "summary":
+        statement = _summary_statement()
+    else:
+        statement = rule_tree_statement(with_items=fields == "items")
+    if after_id is not None:
+        statement = statement.where(ExhibitionRule.id > after_id)
+    statement = statement.limit(limit + 1)
+
+    if fields == "summary":
+        rows = (await db.execute(statement)).mappings().all()
+    else:
+        rows = (await db.scalars(statement)).all()
+    next_after = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_after = last["id"] if fields == "summary" else last.id
+    return rows, next_after
+
+
+async def get_rule(db, rule_id, fields="items"):
+    if fields == "summary":
+        statement = _summary_statement().where(ExhibitionRule.id == rule_id)
+        return (await db.execute(statement)).mappings().first()
+    statement = rule_tree_statement(rule_id=rule_id, with_items=fields == "items")
+    return (await db.scalars(statement)).first()
+
+
+async def list_snapshots(db, url, limit=50):
+    result = await db.scalars(
+        select(RuleSnapshot)
+        .where(RuleSnapshot.url == url)
+        .order_by(RuleSnapshot.created_at.desc(), RuleSnapshot.id.desc())
+        .limit(limit)
+    )
+    return result.all()
+
+
+async def get_snapshot(db, snapshot_id):
+    return await db.get(RuleSnapshot, snapshot_id)
+
+
+async def snapshot_at(db, url, when):
+    # when 시점에 유효했던 스냅샷(그 이전의 마지막 스냅샷)을 찾습니다.
+    result = await db.scalars(
+        select(RuleSnapshot)
+        .where(RuleSnapshot.url == url, RuleSnapshot.created_at <= when)
+        .order_by(RuleSnapshot.created_at.desc(), RuleSnapshot.id.desc())
+        .limit(1)
+    )
+    return result.first()
+
+
+async def _item_texts(db, hashes):
+    texts = {}
+    hashes = list(hashes)
+    for start in range(0, len(hashes), HASH_BATCH_SIZE):
+        batch = hashes[start : start + HASH_BATCH_SIZE]
+        result = await db.execute(
+            select(ItemContent.hash, ItemContent.content).where(
+                ItemContent.hash.in_(batch)
+            )
+        )
+        texts.update(result.all())
+    return texts
+
+
+async def diff_snapshots(db, base, target):
+    # base가 None이면 빈 트리와 비교합니다(첫 스냅샷 이전).
+    bodies = dict(
+        (
+            await db.execute(
+                select(SnapshotManifest.hash, SnapshotManifest.body).where(
+                    SnapshotManifest.hash.in_(
+                        [s.manifest_hash for s in (base, target) if s is not None]
+                    )
+                )
+            )
+        ).all()
+    )
+    old = parse_manifest(bodies[base.manifest_hash]) if base else []
+    new = parse_manifest(bodies[target.manifest_hash])
+    diff = diff_manifests(old, new)
+
+    texts = await _item_texts(db, changed_hashes(diff))
+    for change in diff["changes"]:
+        for key in ("added", "removed", "moved"):
+            if key in change:
+                change[key] = [texts.get(hash_) for hash_ in change[key]]
+    diff["title"] = {"from": base.title if base else None, "to": target.title}
+    return diff
@@ -0,0 +1,165 @@
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from models import PageFetchState, get_session, init_database
+from crawl_jobs import CrawlJobManager
+from config import (
+    CRAWL_URLS,
+    SCHEDULER_TICK,
+    SCHEDULER_MIN_INTERVAL,
+    SCHEDULER_MAX_INTERVAL,
+    SCHEDULER_INITIAL_INTERVAL,
+    SCHEDULER_SPEEDUP,
+    SCHEDULER_BACKOFF,
+    SCHEDULER_JITTER,
+    SCHEDULER_MAX_CRAWLS_PER_HOUR,
+)
+
+CHANGED_STATUSES = {"saved", "empty"}
+UNCHANGED_STATUSES = {"unchanged", "not_modified"}
+
+
+def next_interval(current, changed):
+    # 바뀐 페이지는 더 자주, 바뀌지 않은 페이지는 점점 드물게 확인합니다.
+    current = current or SCHEDULER_INITIAL_INTERVAL
+    factor = SCHEDULER_SPEEDUP if changed else SCHEDULER_BACKOFF
+    return int(
+        min(SCHEDULER_MAX_INTERVAL, max(SCHEDULER_MIN_INTERVAL, current * factor))
+    )
+
+
+def jittered(seconds):
+    spread = seconds * SCHEDULER_JITTER
+    return seconds + random.uniform(-spread, spread)
+
+
+class CrawlScheduler:
+    def __init__(
+        self,
+        urls=None,
+        manager=None,
+        tick=SCHEDULER_TICK,
+        max_crawls_per_hour=SCHEDULER_MAX_CRAWLS_PER_HOUR,
+    ):
+        self.urls = list(urls or CRAWL_URLS)
+        self.manager = manager or CrawlJobManager()
+        self.tick = tick
+        self.max_crawls_per_hour = max_crawls_per_hour
+        self._recent = deque()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def due_urls(self, now=None):
+        now = now or datetime.utcnow()
+        db = get_session()
+        try:
+            states = {
+                row.url: row
+                for row in db.query(PageFetchState)
+                .filter(PageFetchState.url.in_(self.urls))
+                .all()
+            }
+        finally:
+            db.close()
+
+        due = []
+        for url in self.urls:
+            state = states.get(url)
+            next_at = state.next_crawl_at if state else None
+            if next_at is None or next_at <= now:
+                due.append((next_at or datetime.min, url))
+        # 가장 오래 밀린 URL부터 크롤링합니다.
+        return [url for _, url in sorted(due)]
+
+    def remaining_budget(self, now=None):
+        now = now or time.monotonic()
+        while self._recent and now - self._recent[0] >= 3600:
+            self._recent.popleft()
+        return max(self.max_crawls_per_hour - len(self._recent), 0)
+
+    def run_once(self):
+        urls = self.due_urls()[: self.remaining_budget()]
+        if not urls:
+            return None
+
+        now = time.monotonic()
+        self._recent.extend(now for _ in urls)
+        job, _ = self.manager.submit(urls)
+        while not job.finished and not self._stop.is_set():
+            self._stop.wait(1)
+        if job.finished:
+            self.reschedule(
+                {url: entry["status"] for url, entry in job.to_dict()["urls"].items()}
+            )
+        return job
+
+    def reschedule(self, statuses):
+        now = datetime.utcnow()
+        db = get_session()
+        try:
+            states = {
+                row.url: row
+                for row in db.query(PageFetchState)
+                .filter(PageFetchState.url.in_(list(statuses)))
+                .all()
+            }
+            for url, status in statuses.items():
+                state = states.get(url)
+                if state is None:
+                    state = PageFetchState(url=url)
+                    db.add(state)
+
+                if status in CHANGED_STATUSES or status in UNCHANGED_STATUSES:
+                    changed = status in CHANGED_STATUSES
+                    state.check_count = (state.check_count or 0) + 1
+                    if changed:
+                        state.change_count = (state.change_count or 0) + 1
+                    state.crawl_interval = next_interval(state.crawl_interval, changed)
+                    delay = state.crawl_interval
+                else:
+                    # 실패한 URL은 간격을 바꾸지 않고 최소 간격 뒤에 다시 시도합니다.
+                    delay = SCHEDULER_MIN_INTERVAL
+                state.next_crawl_at = now + timedelta(seconds=jittered(delay))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Database error: {str(e)}")
+        finally:
+            db.close()
+
+    def run_forever(self):
+        # 여러 프로세스가 동시에 시작해도 같은 시각에 몰리지 않도록 시작을 흩뜨립니다.
+        self._stop.wait(random.uniform(0, self.tick))
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Scheduler error: {str(e)}")
+            self._stop.wait(self.tick)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self.run_forever, name="crawl-scheduler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    init_database()
+    print(f"스케줄러를 시작합니다. 대상 URL {len(CRAWL_URLS)}개")
+    scheduler = CrawlScheduler()
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import base64
+import json
+import re
+from sqlalchemy import text
+
+SEARCH_MAX_LIMIT = 100
+KEYSET_CONDITION = (
+    "WHERE m.rank < :after_rank OR (m.rank = :after_rank AND m.id > :after_id)"
+)
+
+# PostgreSQL: tsvector 컬럼 + GIN 인덱스, 트리거로 저장 시점에 갱신합니다.
+# 함수/트리거 정의를 바꾸면 버전을 올립니다. 설치된 버전은 트리거 함수의
+# 주석으로 남겨 두고, 같으면 프로세스 시작 때 DDL과 백필을 건너뜁니다.
+POSTGRES_SETUP_VERSION = "search-index v2"
+POSTGRES_SETUP_LOCK = 7_304_001
+POSTGRES_INSTALLED_VERSION = (
+    "SELECT obj_description(to_regproc('rule_items_search_trigger'), 'pg_proc')"
+)
+POSTGRES_SETUP = [
+    "ALTER TABLE rule_items ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE INDEX IF NOT EXISTS ix_rule_items_search_vector "
+    "ON rule_items USING GIN (search_vector)",
+    """
+    CREATE OR REPLACE FUNCTION rule_item_search_vector(
+        item_category_id integer, ko text, en text
+    ) RETURNS tsvector AS $$
+        SELECT setweight(to_tsvector('simple', coalesce(
+                   (SELECT name FROM rule_categories WHERE id = item_category_id), ''
+               )), 'A')
+            || setweight(to_tsvector('simple', coalesce(ko, '')), 'B')
+            || setweight(to_tsvector('simple', coalesce(en, '')), 'B')
+    $$ LANGUAGE sql STABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION rule_items_search_trigger() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := rule_item_search_vector(
+            NEW.category_id, NEW.content_ko, NEW.content_en
+        );
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS rule_items_search_update ON rule_items",
+    """
+    CREATE TRIGGER rule_items_search_update
+    BEFORE INSERT OR UPDATE OF content_ko, content_en, category_id ON rule_items
+    FOR EACH ROW EXECUTE FUNCTION rule_items_search_trigger()
+    """,
+    # 카테고리 이름은 항목 tsvector에 들어가므로 이름이 바뀌면 항목을 다시 계산합니다.
+    """
+    CREATE OR REPLACE FUNCTION rule_categories_search_trigger() RETURNS trigger AS $$
+    BEGIN
+        UPDATE rule_items
+        SET search_vector = rule_item_search_vector(category_id, content_ko, content_en)
+        WHERE category_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS rule_categories_search_update ON rule_categories",
+    """
+    CREATE TRIGGER rule_categories_search_update
+    AFTER UPDATE OF name ON rule_categories
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION rule_categories_search_trigger()
+    """,
+    # 일회성 백필: 트리거가 생기기 전에 저장된 항목만 채웁니다.
+    """
+    UPDATE rule_items
+    SET search_vector = rule_item_search_vector(category_id, content_ko, content_en)
+    WHERE search_vector IS NULL
+    """,
+    f"COMMENT ON FUNCTION rule_items_search_trigger() IS '{POSTGRES_SETUP_VERSION}'",
+]
+
+# SQLite(로컬/테스트): FTS5 가상 테이블을 트리거로 동기화합니다.
+SQLITE_SETUP = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS rule_items_fts
+    USING fts5(category_name, content_ko, content_en, tokenize='unicode61')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS rule_items_fts_insert AFTER INSERT ON rule_items
+    BEGIN
+        INSERT INTO rule_items_fts(rowid, category_name, content_ko, content_en)
+        VALUES (
+            new.id,
+            (SELECT name FROM rule_categories WHERE id = new.category_id),
+            new.content_ko,
+            new.content_en
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS rule_items_fts_delete AFTER DELETE ON rule_items
+    BEGIN
+        DELETE FROM rule_items_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS rule_items_fts_update
+    AFTER UPDATE OF content_ko, content_en, category_id ON rule_items
+    BEGIN
+        DELETE FROM rule_items_fts WHERE rowid = old.id;
+        INSERT INTO rule_items_fts(rowid, category_name, content_ko, content_en)
+        VALUES (
+            new.id,
+            (SELECT name FROM rule_categories WHERE id = new.category_id),
+            new.content_ko,
+            new.content_en
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS rule_categories_fts_rename
+    AFTER UPDATE OF name ON rule_categories
+    WHEN old.name IS NOT new.name
+    BEGIN
+        UPDATE rule_items_fts SET category_name = new.name
+        WHERE rowid IN (SELECT id FROM rule_items WHERE category_id = new.id);
+    END
+    """,
+    """
+    INSERT INTO rule_items_fts(rowid, category_name, content_ko, content_en)
+    SELECT ri.id, rc.name, ri.content_ko, ri.content_en
+    FROM rule_items ri LEFT JOIN rule_categories rc ON rc.id = ri.category_id
+    WHERE ri.id NOT IN (SELECT rowid FROM rule_items_fts)
+    """,
+]
+
+POSTGRES_SEARCH = """
+    WITH matches AS (
+        SELECT ri.id, query.q AS query,
+               ts_rank_cd(ri.search_vector, query.q)::float8 AS rank
+        FROM rule_items ri,
+             (SELECT websearch_to_tsquery('simple', :query) AS q) AS query
+        WHERE ri.search_vector @@ query.q
+    )
+    SELECT m.id AS item_id, m.rank, rc.id AS category_id, rc.name AS category_name,
+           er.id AS rule_id, er.title AS rule_title,
+           coalesce(ri.content_ko, ri.content_en) AS content,
+           ts_headline(
+               'simple', coalesce(ri.content_ko, ri.content_en, ''), m.query,
+               'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15'
+           ) AS snippet
+    FROM (
+        SELECT * FROM matches AS m
+        {keyset}
+        ORDER BY rank DESC, id
+        LIMIT :limit
+    ) AS m
+    JOIN rule_items ri ON ri.id = m.id
+    JOIN rule_categories rc ON rc.id = ri.category_id
+    JOIN exhibition_rules er ON er.id = rc.exhibition_rule_id
+    ORDER BY m.rank DESC, m.id
+"""
+
+# bm25()는 작을수록 관련도가 높으므로 부호를 바꿔 두 DB의 정렬 방향을 맞춥니다.
+SQLITE_SEARCH = """
+    SELECT ri.id AS item_id, m.rank, rc.id AS category_id,
+           rc.name AS category_name, er.id AS rule_id, er.title AS rule_title,
+           coalesce(ri.content_ko, ri.content_en) AS content, m.snippet
+    FROM (
+        SELECT rowid AS id, -bm25(rule_items_fts, 2.0, 1.0, 1.0) AS rank,
+               snippet(rule_items_fts, -1, '<mark>', '</mark>', '…', 24) AS snippet
+        FROM rule_items_fts
+        WHERE rule_items_fts MATCH :query
+    ) AS m
+    JOIN rule_items ri ON ri.id = m.id
+    JOIN rule_categories rc ON rc.id = ri.category_id
+    JOIN exhibition_rules er ON er.id = rc.exhibition_rule_id
+    {keyset}
+    ORDER BY m.rank DESC, m.id
+    LIMIT :limit
+"""
+
+
+def _postgres_setup_current(conn):
+    return conn.execute(text(POSTGRES_INSTALLED_VERSION)).scalar() == (
+        POSTGRES_SETUP_VERSION
+    )
+
+
+def setup_search_index(engine):
+    dialect = engine.dialect.name
+    statements = {"postgresql": POSTGRES_SETUP, "sqlite": SQLITE_SETUP}.get(dialect)
+    if statements is None:
+        return False
+    if dialect == "postgresql":
+        with engine.connect() as conn:
+            if _postgres_setup_current(conn):
+                return True
+    with engine.begin() as conn:
+        if dialect == "postgresql":
+            # 여러 워커가 동시에 시작해도 한 프로세스만 DDL/백필을 실행합니다.
+            conn.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"),
+                {"key": POSTGRES_SETUP_LOCK},
+            )
+            if _postgres_setup_current(conn):
+                return True
+        for statement in statements:
+            conn.execute(text(statement))
+    return True
+
+
+def encode_cursor(rank, item_id):
+    raw = json.dumps([rank, item_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None, None
+    try:
+        rank, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return float(rank), int(item_id)
+    except (ValueError, TypeError):
+        raise ValueError("invalid cursor")
+
+
+def sqlite_match_query(query):
+    # 사용자 입력을 FTS5 문법으로 해석하지 않도록 단어마다 따옴표로 감쌉니다.
+    tokens = re.findall(r"\w+", query)
+    return " ".join(f'"{token}"' for token in tokens)
+
+
+async def search_items(db, query, limit=20, cursor=None):
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    after_rank, after_id = decode_cursor(cursor)
+    dialect = db.bind.dialect.name
+
+    if dialect == "postgresql":
+        statement, match = POSTGRES_SEARCH, query
+    elif dialect == "sqlite":
+        statement, match = SQLITE_SEARCH, sqlite_match_query(query)
+    else:
+        raise ValueError(f"search is not supported on {dialect}")
+
+    if not match.strip():
+        return {"query": query, "results": [], "next_cursor": None}
+
+    params = {"query": match, "limit": limit + 1}
+    keyset = ""
+    if after_rank is not None:
+        keyset = KEYSET_CONDITION
+        params.update(after_rank=after_rank, after_id=after_id)
+    result = await db.execute(text(statement.format(keyset=keyset)), params)
+    rows = [dict(row._mapping) for row in result]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["rank"], rows[-1]["item_id"])
+    return {"query": query, "results": rows, "next_cursor": next_cursor}
@@ -0,0 +1,166 @@
+import hashlib
+import json
+from difflib import SequenceMatcher
+from sqlalchemy import select, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from models import ItemContent, SnapshotManifest, RuleSnapshot
+
+# IN 절 하나에 넣는 해시 개수 (SQLite 바인드 변수 제한 이하)
+HASH_BATCH_SIZE = 500
+DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def manifest_body(categories):
+    # categories: [(카테고리 이름, [항목 해시, ...]), ...]
+    return json.dumps(
+        [[name, list(hashes)] for name, hashes in categories],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def parse_manifest(body):
+    return [(name, hashes) for name, hashes in json.loads(body)]
+
+
+def _batches(values):
+    values = list(values)
+    for start in range(0, len(values), HASH_BATCH_SIZE):
+        yield values[start : start + HASH_BATCH_SIZE]
+
+
+def _insert_new(db, model):
+    # 조회와 INSERT 사이에 다른 프로세스(웹/워커)가 같은 해시를 먼저 저장할 수 있으므로
+    # 충돌은 무시합니다. 그렇지 않으면 IntegrityError로 페이지 저장 전체가 롤백됩니다.
+    make_insert = DIALECT_INSERTS.get(db.get_bind().dialect.name)
+    if make_insert is None:
+        return insert(model)
+    return make_insert(model).on_conflict_do_nothing(index_elements=[model.hash])
+
+
+def _store_missing(db, model, rows):
+    # 이미 저장된 해시는 건너뛰고 새 본문만 한 번에 INSERT 합니다.
+    existing = set()
+    for batch in _batches(rows):
+        existing.update(db.scalars(select(model.hash).where(model.hash.in_(batch))))
+    missing = [row for hash_, row in rows.items() if hash_ not in existing]
+    if missing:
+        db.execute(_insert_new(db, model), missing)
+    return len(missing)
+
+
+def latest_snapshot(db, url):
+    return db.scalars(
+        select(RuleSnapshot)
+        .where(RuleSnapshot.url == url)
+        .order_by(RuleSnapshot.created_at.desc(), RuleSnapshot.id.desc())
+        .limit(1)
+    ).first()
+
+
+def record_snapshot(db, rule_id, url, title, categories):
+    # categories: [(카테고리 이름, [(항목 해시, 본문), ...]), ...]
+    # 직전 스냅샷과 제목·구조가 같으면 새로 기록하지 않고 None을 반환합니다.
+    contents = {}
+    structure = []
+    for name, items in categories:
+        structure.append((name, [hash_ for hash_, _ in items]))
+        for hash_, text in items:
+            contents.setdefault(hash_, {"hash": hash_, "content": text})
+
+    item_count = sum(len(hashes) for _, hashes in structure)
+    body = manifest_body(structure)
+    manifest_hash = hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+    previous = latest_snapshot(db, url)
+    if (
+        previous is not None
+        and previous.manifest_hash == manifest_hash
+        and previous.title == title
+    ):
+        return None
+
+    _store_missing(db, ItemContent, contents)
+    _store_missing(
+        db,
+        SnapshotManifest,
+        {
+            manifest_hash: {
+                "hash": manifest_hash,
+                "body": body,
+                "item_count": item_count,
+            }
+        },
+    )
+    snapshot = RuleSnapshot(
+        url=url,
+        exhibition_rule_id=rule_id,
+        title=title,
+        manifest_hash=manifest_hash,
+        item_count=item_count,
+    )
+    db.add(snapshot)
+    db.flush()
+    return snapshot
+
+
+def diff_manifests(old, new):
+    # 본문은 읽지 않고 해시 목록만 비교합니다. 결과의 해시는
+    # 호출하는 쪽에서 바뀐 항목만 골라 본문으로 바꿉니다.
+    old_categories = dict(old)
+    new_categories = dict(new)
+    old_order = [name for name, _ in old]
+    new_order = [name for name, _ in new]
+
+    changes = []
+    for name in new_order:
+        if name not in old_categories:
+            changes.append(
+                {"category": name, "status": "added", "added": new_categories[name]}
+            )
+            continue
+        before, after = old_categories[name], new_categories[name]
+        if before == after:
+            continue
+        added, removed = [], []
+        matcher = SequenceMatcher(a=before, b=after, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag in ("delete", "replace"):
+                removed.extend(before[i1:i2])
+            if tag in ("insert", "replace"):
+                added.extend(after[j1:j2])
+        # 양쪽에 모두 있는 항목은 순서만 바뀐 것으로 봅니다.
+        moved = set(added) & set(removed)
+        changes.append(
+            {
+                "category": name,
+                "status": "modified",
+                "added": [hash_ for hash_ in added if hash_ not in moved],
+                "removed": [hash_ for hash_ in removed if hash_ not in moved],
+                "moved": [hash_ for hash_ in after if hash_ in moved],
+            }
+        )
+    for name in old_order:
+        if name not in new_categories:
+            changes.append(
+                {
+                    "category": name,
+                    "status": "removed",
+                    "removed": old_categories[name],
+                }
+            )
+
+    common = [name for name in new_order if name in old_categories]
+    return {
+        "categories_reordered": common
+        != [name for name in old_order if name in new_categories],
+        "changes": changes,
+    }
+
+
+def changed_hashes(diff):
+    hashes = set()
+    for change in diff["changes"]:
+        for key in ("added", "removed", "moved"):
+            hashes.update(change.get(key, ()))
+    return hashes
@@ -0,0 +1,199 @@
+import argparse
+import importlib
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from config import STARTUP_PROFILE
+
+started = time.perf_counter()
+_imports = {}
+_phases = {}
+_local = threading.local()
+_state = {"phase": "startup", "ready_at": None}
+
+
+class _TimedLoader:
+    # 실제 로더에 위임하면서 exec_module 시간만 잽니다. 실행이 끝나면 원래 로더로 되돌려
+    # 모듈의 __loader__/__spec__.loader에는 흔적이 남지 않습니다.
+    def __init__(self, loader):
+        self._loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def exec_module(self, module):
+        stack = _local.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+        begin = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            total = time.perf_counter() - begin
+            children = stack.pop()
+            if stack:
+                stack[-1] += total
+            _imports[module.__name__] = {
+                "self": total - children,
+                "total": total,
+                "phase": _state["phase"],
+            }
+            module.__loader__ = self._loader
+            if module.__spec__ is not None:
+                module.__spec__.loader = self._loader
+
+
+class ImportTimer:
+    # sys.meta_path 맨 앞에서 다른 finder가 찾은 spec의 로더만 감쌉니다(-X importtime과 같은 self/누적 시간).
+    def find_spec(self, name, path=None, target=None):
+        if getattr(_local, "finding", False):
+            return None
+        _local.finding = True
+        try:
+            for finder in sys.meta_path:
+                find = getattr(finder, "find_spec", None)
+                if finder is self or find is None:
+                    continue
+                spec = find(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            _local.finding = False
+        if spec.origin in ("built-in", "frozen") or not hasattr(
+            spec.loader, "exec_module"
+        ):
+            return spec
+        spec.loader = _TimedLoader(spec.loader)
+        return spec
+
+
+_timer = ImportTimer()
+
+
+def install():
+    if _timer not in sys.meta_path:
+        sys.meta_path.insert(0, _timer)
+
+
+def record_phase(name, seconds):
+    _phases[name] = round(seconds, 4)
+
+
+@contextmanager
+def phase(name):
+    begin = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - begin)
+
+
+def mark_imported(module_name):
+    record_phase(f"import {module_name}", time.perf_counter() - started)
+
+
+def mark_ready():
+    # 이후의 import는 첫 사용 시점에 일어난 지연 로딩으로 분류됩니다.
+    if _state["ready_at"] is None:
+        _state["ready_at"] = time.perf_counter()
+        _state["phase"] = "lazy"
+        record_phase("ready", _state["ready_at"] - started)
+
+
+def warm_up(tasks):
+    # 무거운 모듈을 백그라운드에서 미리 불러옵니다. 요청 처리는 기다리지 않습니다.
+    def run():
+        for name, load in tasks:
+            try:
+                with phase(f"warmup {name}"):
+                    load()
+            except Exception as e:
+                print(f"Warm-up error ({name}): {str(e)}")
+
+    if tasks:
+        threading.Thread(target=run, name="warmup", daemon=True).start()
+
+
+def _top(phase_name, limit):
+    entries = [
+        (name, entry)
+        for name, entry in _imports.items()
+        if entry["phase"] == phase_name
+    ]
+    entries.sort(key=lambda pair: pair[1]["self"], reverse=True)
+    return {
+        "count": len(entries),
+        "seconds": round(sum(entry["self"] for _, entry in entries), 4),
+        "modules": [
+            {
+                "module": name,
+                "self": round(entry["self"], 4),
+                "total": round(entry["total"], 4),
+            }
+            for name, entry in entries[:limit]
+        ],
+    }
+
+
+def profile(limit=20, watched=()):
+    return {
+        "enabled": _timer in sys.meta_path,
+        "uptime": round(time.perf_counter() - started, 3),
+        "phases": dict(_phases),
+        "imports": {
+            "startup": _top("startup", limit),
+            "lazy": _top("lazy", limit),
+        },
+        "loaded": {name: name in sys.modules for name in watched},
+    }
+
+
+def collect():
+    yield (
+        "app_startup_phase_seconds",
+        "Startup phase durations",
+        "gauge",
+        [({"phase": name}, seconds) for name, seconds in sorted(_phases.items())],
+    )
+    yield (
+        "app_import_seconds",
+        "Module import time by phase",
+        "gauge",
+        [
+            ({"phase": phase_name}, _top(phase_name, 0)["seconds"])
+            for phase_name in ("startup", "lazy")
+        ],
+    )
+
+
+if STARTUP_PROFILE:
+    install()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모듈별 import 시간 측정")
+    parser.add_argument("modules", nargs="*", default=["main"])
+    parser.add_argument("--limit", type=int, default=25)
+    args = parser.parse_args()
+
+    # python startup.py로 실행해도 main.py가 import하는 startup 모듈과 상태를 공유합니다.
+    sys.modules.setdefault("startup", sys.modules[__name__])
+    install()
+    for name in args.modules:
+        with phase(f"import {name}"):
+            importlib.import_module(name)
+    report = profile(args.limit)
+    for name, seconds in report["phases"].items():
+        print(f"{name}: {seconds * 1000:.1f}ms")
+    print(f"{'self(ms)':>10} {'total(ms)':>10}  module")
+    for entry in report["imports"]["startup"]["modules"]:
+        print(
+            f"{entry['self'] * 1000:10.1f} {entry['total'] * 1000:10.1f}  "
+            f"{entry['module']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
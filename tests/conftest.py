@@ -0,0 +1,18 @@
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(ROOT_DIR, "benchmarks", "fixtures")
+
+# config.py가 import 시점에 환경 변수를 읽으므로 앱 모듈보다 먼저 임시 SQLite DB로 지정합니다.
+_db_dir = tempfile.mkdtemp(prefix="rules-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.setdefault("DEDUP_ENABLED", "false")
+os.environ.setdefault("TRANSLATOR_BACKEND", "none")
+sys.path.insert(0, ROOT_DIR)
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, f"{name}.html"), encoding="utf-8") as f:
+        return f.read()
@@ -0,0 +1,97 @@
+import json
+import pytest
+from conftest import load_fixture
+from crawl_jobs import CrawlJob
+from crawler import ExhibitionRuleCrawler, content_hash
+from models import init_database
+from translation import StandInTranslator, TranslationPipeline
+
+GOOD_URLS = [
+    "https://gsma.my.site.com/mwcoem/s/Event Rules and Regulations",
+    "https://gsma.my.site.com/mwcoem/s/Stand Build Rules and Regulations",
+]
+BAD_URL = "https://gsma.my.site.com/mwcoem/s/broken"
+
+
+class FixtureFetcher:
+    # 좋은 페이지는 픽스처 HTML을, 깨진 페이지는 JSON이 아닌 본문을 돌려주는 가짜 백엔드입니다.
+    name = "fixture"
+
+    def __init__(self, crawler, bodies):
+        self.crawler = crawler
+        self.bodies = bodies
+
+    def fetch(self, url, state=None, deadline_at=None):
+        body = self.bodies[url]
+        digest = content_hash(body)
+        unchanged = state and state.get("content_hash") == digest
+        return {
+            "url": url,
+            "status": "unchanged" if unchanged else "modified",
+            "body": body,
+            "etag": None,
+            "last_modified": None,
+            "content_hash": digest,
+        }
+
+    def parse(self, url, body):
+        if url == BAD_URL:
+            return json.loads(body)
+        return self.crawler.parse_page(body, url)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def database():
+    init_database()
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_bad_page_does_not_fail_other_pages(max_workers):
+    urls = [GOOD_URLS[0], BAD_URL, GOOD_URLS[1]]
+    bodies = {
+        GOOD_URLS[0]: load_fixture("event_rules"),
+        GOOD_URLS[1]: load_fixture("stand_build_rules"),
+        BAD_URL: "<html><body>Login required</body></html>",
+    }
+    crawler = ExhibitionRuleCrawler(max_workers=max_workers)
+    crawler.fetcher = FixtureFetcher(crawler, bodies)
+    job = CrawlJob(urls, force=True)
+
+    results = crawler.crawl_and_save(urls, force=True, progress=job)
+
+    assert results[BAD_URL] == "failed"
+    for url in GOOD_URLS:
+        assert results[url] in ("saved", "unchanged")
+    progress = job.to_dict()["urls"]
+    assert progress[BAD_URL]["status"] == "failed"
+    assert progress[BAD_URL]["errors"]
+    assert all(entry["status"] != "running" for entry in progress.values())
+
+
+class FlakyTranslator(StandInTranslator):
+    name = "flaky"
+
+    def __init__(self):
+        self.available = False
+
+    def translate_batch(self, texts, source_lang, target_lang):
+        if not self.available:
+            raise RuntimeError("translator unavailable")
+        return super().translate_batch(texts, source_lang, target_lang)
+
+
+def test_untranslated_page_is_parsed_again_next_crawl():
+    url = "https://gsma.my.site.com/mwcoem/s/translated"
+    translator = FlakyTranslator()
+    crawler = ExhibitionRuleCrawler(
+        max_workers=1, translation=TranslationPipeline(translator=translator)
+    )
+    crawler.fetcher = FixtureFetcher(crawler, {url: load_fixture("new_for_2026")})
+    job = CrawlJob([url])
+
+    assert crawler.crawl_and_save([url], progress=job) == {url: "saved"}
+    assert job.to_dict()["urls"][url]["errors"]
+
+    translator.available = True
+    assert crawler.crawl_and_save([url]) == {url: "saved"}
+    assert crawler.crawl_and_save([url]) == {url: "unchanged"}
@@ -0,0 +1,74 @@
+import json
+import pytest
+from crawler import ExhibitionRuleCrawler, item_hash
+from fetchers import SalesforceContentFetcher
+from models import init_database
+
+BASE_URL = "https://gsma.my.site.com/mwcoem/s/"
+PAYLOAD = {
+    "title": "Event Rules",
+    "items": [
+        {
+            "title": "Admission",
+            "contentNodes": {
+                "body": {
+                    "nodeType": "RichText",
+                    "value": "&lt;ul&gt;&lt;li&gt;Badges must be worn at all times&lt;/li&gt;&lt;/ul&gt;",
+                }
+            },
+        }
+    ],
+}
+
+
+class StubContentFetcher(SalesforceContentFetcher):
+    # CMS 요청 대신 URL별로 정해 둔 응답 본문을 돌려줍니다.
+    def __init__(self, crawler, bodies):
+        super().__init__(crawler, channel="0ap000000000001")
+        self.bodies = bodies
+
+    def fetch(self, url, state=None, deadline_at=None):
+        body = self.bodies[url]
+        return {
+            "url": url,
+            "status": "modified",
+            "body": body,
+            "etag": None,
+            "last_modified": None,
+            "content_hash": item_hash(body),
+        }
+
+
+@pytest.mark.parametrize(
+    "body, message",
+    [
+        ("<html><body>Please log in</body></html>", "not JSON"),
+        (
+            json.dumps([{"errorCode": "NOT_FOUND", "message": "No content"}]),
+            "NOT_FOUND",
+        ),
+        (json.dumps(["unexpected"]), "not an object"),
+        (json.dumps({"items": ["unexpected"]}), "Unexpected CMS content shape"),
+    ],
+)
+def test_parse_rejects_non_content_responses(body, message):
+    fetcher = SalesforceContentFetcher(None, channel="0ap000000000001")
+    with pytest.raises(ValueError, match=message):
+        fetcher.parse(BASE_URL + "Event Rules", body)
+
+
+def test_login_redirect_fails_only_its_url():
+    init_database()
+    good_url, bad_url = BASE_URL + "cms-good", BASE_URL + "cms-login"
+    crawler = ExhibitionRuleCrawler(max_workers=2)
+    crawler.fetcher = StubContentFetcher(
+        crawler,
+        {
+            good_url: json.dumps(PAYLOAD),
+            bad_url: "<html><body>Please log in</body></html>",
+        },
+    )
+
+    results = crawler.crawl_and_save([good_url, bad_url], force=True)
+
+    assert results == {good_url: "saved", bad_url: "failed"}
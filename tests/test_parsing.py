@@ -0,0 +1,40 @@
+import pytest
+from conftest import load_fixture
+from crawler import ExhibitionRuleCrawler
+
+FIXTURES = {
+    "new_for_2026": "https://gsma.my.site.com/mwcoem/s/New for 2026",
+    "event_rules": "https://gsma.my.site.com/mwcoem/s/Event Rules and Regulations",
+    "stand_build_rules": "https://gsma.my.site.com/mwcoem/s/Stand Build Rules and Regulations",
+}
+GENERIC_URL = "https://gsma.my.site.com/mwcoem/s/generic"
+PARSER_PATHS = [("lxml", True), ("lxml", False), ("html.parser", True)]
+FOOTER_TEXT = "All rights reserved"
+
+CASES = [
+    (name, url)
+    for name, page_url in FIXTURES.items()
+    for url in (page_url, GENERIC_URL)
+]
+
+
+def parse(name, url, backend, strain):
+    crawler = ExhibitionRuleCrawler(parser_backend=backend, parser_strain=strain)
+    return crawler.parse_page(load_fixture(name), url)["categories"]
+
+
+@pytest.mark.parametrize("name, url", CASES)
+@pytest.mark.parametrize("backend, strain", PARSER_PATHS)
+def test_footer_is_not_parsed_as_item(name, url, backend, strain):
+    categories = parse(name, url, backend, strain)
+    items = [text for texts in categories.values() for text in texts]
+    assert items
+    assert not [text for text in items if FOOTER_TEXT in text]
+    assert not [category for category in categories if FOOTER_TEXT in category]
+
+
+@pytest.mark.parametrize("name, url", CASES)
+def test_strained_and_full_parses_match(name, url):
+    expected = parse(name, url, "lxml", False)
+    assert parse(name, url, "lxml", True) == expected
+    assert parse(name, url, "html.parser", True) == expected
@@ -0,0 +1,39 @@
+from sqlalchemy import event, func, select
+from models import ItemContent, get_session, init_database
+from snapshots import _store_missing
+
+
+def test_concurrent_insert_of_same_hash_is_ignored():
+    # 조회 뒤 INSERT 직전에 다른 세션이 같은 해시를 먼저 저장하는 경합을 재현합니다.
+    engine = init_database()
+    row = {"hash": "f" * 64, "content": "Badges must be worn at all times"}
+    raced = []
+
+    def insert_first(conn, cursor, statement, parameters, context, executemany):
+        if raced or not statement.lstrip().upper().startswith(
+            "INSERT INTO ITEM_CONTENTS"
+        ):
+            return
+        raced.append(statement)
+        other = get_session()
+        try:
+            other.add(ItemContent(**row))
+            other.commit()
+        finally:
+            other.close()
+
+    event.listen(engine, "before_cursor_execute", insert_first)
+    db = get_session()
+    try:
+        _store_missing(db, ItemContent, {row["hash"]: row})
+        db.commit()
+        count = db.scalar(
+            select(func.count())
+            .select_from(ItemContent)
+            .where(ItemContent.hash == row["hash"])
+        )
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", insert_first)
+    assert raced
+    assert count == 1
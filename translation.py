@@ -0,0 +1,211 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from sqlalchemy import select, insert
+from sqlalchemy.exc import IntegrityError
+import metrics
+from models import TranslationMemory, get_session
+from config import (
+    TRANSLATOR_BACKEND,
+    TRANSLATION_SOURCE_LANG,
+    TRANSLATION_TARGET_LANG,
+    TRANSLATION_BATCH_SIZE,
+    TRANSLATION_BATCH_CHARS,
+    TRANSLATION_CONCURRENCY,
+    CRAWL_TIMEOUT,
+    DEEPL_API_KEY,
+    DEEPL_API_URL,
+)
+
+# IN 절 하나에 넣는 해시 개수 (SQLite 바인드 변수 제한 이하)
+LOOKUP_BATCH_SIZE = 500
+
+
+def source_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class StandInTranslator:
+    # 외부 API 없이 결정적인 결과를 돌려주는 로컬/테스트용 번역기입니다.
+    name = "standin"
+
+    def translate_batch(self, texts, source_lang, target_lang):
+        return [f"[{target_lang}] {text}" for text in texts]
+
+
+class DeepLTranslator:
+    name = "deepl"
+
+    def __init__(self, api_key=DEEPL_API_KEY, api_url=DEEPL_API_URL):
+        if not api_key:
+            raise ValueError("DEEPL_API_KEY is not set")
+        self.api_url = api_url
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"DeepL-Auth-Key {api_key}"
+
+    def translate_batch(self, texts, source_lang, target_lang):
+        response = self.session.post(
+            self.api_url,
+            data={
+                "text": texts,
+                "source_lang": source_lang.upper(),
+                "target_lang": target_lang.upper(),
+            },
+            timeout=CRAWL_TIMEOUT,
+        )
+        response.raise_for_status()
+        results = [entry["text"] for entry in response.json()["translations"]]
+        # 개수가 다르면 어느 번역이 어느 원문인지 알 수 없으므로 배치 전체를 버립니다.
+        if len(results) != len(texts):
+            raise ValueError(
+                f"DeepL returned {len(results)} translations for {len(texts)} texts"
+            )
+        return results
+
+
+def make_translator(backend=TRANSLATOR_BACKEND):
+    if backend == "standin":
+        return StandInTranslator()
+    if backend == "deepl":
+        return DeepLTranslator()
+    return None
+
+
+class TranslationPipeline:
+    def __init__(
+        self,
+        translator=None,
+        source_lang=TRANSLATION_SOURCE_LANG,
+        target_lang=TRANSLATION_TARGET_LANG,
+        batch_size=TRANSLATION_BATCH_SIZE,
+        batch_chars=TRANSLATION_BATCH_CHARS,
+        concurrency=TRANSLATION_CONCURRENCY,
+    ):
+        self.translator = translator or make_translator()
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.batch_size = batch_size
+        self.batch_chars = batch_chars
+        self.concurrency = concurrency
+
+    @property
+    def enabled(self):
+        return self.translator is not None
+
+    def translate_parsed(self, parsed_data):
+        # 카테고리 이름과 항목 본문의 번역을 parsed_data["translations"]에 담고,
+        # 배치 실패로 번역하지 못한 문장 수를 parsed_data["untranslated"]에 남깁니다.
+        if not self.enabled:
+            return parsed_data
+        texts = list(parsed_data["categories"])
+        for items in parsed_data["categories"].values():
+            texts.extend(items)
+        translations = self.translate_texts(texts)
+        untranslated = {text for text in texts if text.strip()} - set(translations)
+        return dict(
+            parsed_data, translations=translations, untranslated=len(untranslated)
+        )
+
+    def translate_texts(self, texts):
+        unique = {source_hash(text): text for text in texts if text.strip()}
+        found = self._lookup(list(unique))
+        misses = [
+            (digest, text) for digest, text in unique.items() if digest not in found
+        ]
+        metrics.TRANSLATION_LOOKUPS.inc(len(found), result="hit")
+        metrics.TRANSLATION_LOOKUPS.inc(len(misses), result="miss")
+
+        translated = {}
+        if misses:
+            batches = list(self._batches(misses))
+            with ThreadPoolExecutor(
+                max_workers=max(1, min(self.concurrency, len(batches))),
+                thread_name_prefix="translate",
+            ) as pool:
+                for result in pool.map(self._translate_batch, batches):
+                    translated.update(result)
+            self._store(translated, unique)
+
+        found.update(translated)
+        return {unique[digest]: text for digest, text in found.items()}
+
+    def _batches(self, entries):
+        # 문장 수와 전체 글자 수 둘 다 제한을 넘지 않도록 나눕니다.
+        batch, size = [], 0
+        for digest, text in entries:
+            if batch and (
+                len(batch) >= self.batch_size or size + len(text) > self.batch_chars
+            ):
+                yield batch
+                batch, size = [], 0
+            batch.append((digest, text))
+            size += len(text)
+        if batch:
+            yield batch
+
+    def _translate_batch(self, batch):
+        name = self.translator.name
+        try:
+            with metrics.traced(
+                metrics.TRANSLATION_SECONDS, "translate", translator=name
+            ):
+                results = self.translator.translate_batch(
+                    [text for _, text in batch], self.source_lang, self.target_lang
+                )
+            translated = {
+                digest: text for (digest, _), text in zip(batch, results, strict=True)
+            }
+        except Exception as e:
+            # 실패한 배치는 원문을 그대로 쓰고 번역 메모리에 남기지 않습니다. 크롤러는 이런
+            # 페이지의 본문 해시/ETag를 갱신하지 않으므로 다음 크롤링에서 다시 파싱/번역합니다.
+            metrics.TRANSLATION_FAILURES.inc(translator=name)
+            print(f"Translation error: {str(e)}")
+            return {}
+        return translated
+
+    def _lookup(self, digests):
+        found = {}
+        db = get_session()
+        try:
+            for start in range(0, len(digests), LOOKUP_BATCH_SIZE):
+                rows = db.execute(
+                    select(
+                        TranslationMemory.source_hash,
+                        TranslationMemory.translated_text,
+                    ).where(
+                        TranslationMemory.target_lang == self.target_lang,
+                        TranslationMemory.source_hash.in_(
+                            digests[start : start + LOOKUP_BATCH_SIZE]
+                        ),
+                    )
+                )
+                found.update(rows.all())
+        finally:
+            db.close()
+        return found
+
+    def _store(self, translated, sources):
+        if not translated:
+            return
+        rows = [
+            {
+                "source_hash": digest,
+                "target_lang": self.target_lang,
+                "source_text": sources[digest],
+                "translated_text": text,
+                "translator": self.translator.name,
+            }
+            for digest, text in translated.items()
+        ]
+        db = get_session()
+        try:
+            db.execute(insert(TranslationMemory), rows)
+            db.commit()
+        except IntegrityError:
+            # 다른 프로세스가 같은 문장을 먼저 저장한 경우입니다. 다음 조회에서 재사용됩니다.
+            db.rollback()
+        except Exception as e:
+            db.rollback()
+            print(f"Database error: {str(e)}")
+        finally:
+            db.close()